@@ -0,0 +1,39 @@
+"""Add indexes for the daily question and answered-today lookups
+
+Revision ID: 4c1d8e7f2a90
+Revises: e011fe832da1
+Create Date: 2026-10-17 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1d8e7f2a90'
+down_revision: Union[str, None] = 'e011fe832da1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_questions_recipient_id_unanswered',
+        'questions',
+        ['recipient_id', 'created_at'],
+        unique=False,
+        postgresql_where=sa.text('is_answered = false'),
+    )
+    op.create_index(
+        'ix_answers_user_id_created_at',
+        'answers',
+        ['user_id', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answers_user_id_created_at', table_name='answers')
+    op.drop_index('ix_questions_recipient_id_unanswered', table_name='questions')
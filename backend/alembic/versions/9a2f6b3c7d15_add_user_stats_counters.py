@@ -0,0 +1,61 @@
+"""Add user_stats and question_pair_counts counters
+
+Revision ID: 9a2f6b3c7d15
+Revises: 4c1d8e7f2a90
+Create Date: 2026-10-17 11:03:48.215604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a2f6b3c7d15'
+down_revision: Union[str, None] = '4c1d8e7f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.String(36), nullable=False),
+    sa.Column('questions_asked', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('questions_answered', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('question_pair_counts',
+    sa.Column('author_id', sa.String(36), nullable=False),
+    sa.Column('recipient_id', sa.String(36), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['recipient_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('author_id', 'recipient_id')
+    )
+    op.create_index('ix_question_pair_counts_author_id_count', 'question_pair_counts', ['author_id', 'count'], unique=False)
+    op.create_index('ix_question_pair_counts_recipient_id_count', 'question_pair_counts', ['recipient_id', 'count'], unique=False)
+
+    # Backfill the counters from existing history
+    op.execute("""
+        INSERT INTO question_pair_counts (author_id, recipient_id, count)
+        SELECT author_id, recipient_id, COUNT(*)
+        FROM questions
+        WHERE author_id IS NOT NULL AND recipient_id IS NOT NULL
+        GROUP BY author_id, recipient_id
+    """)
+    op.execute("""
+        INSERT INTO user_stats (user_id, questions_asked, questions_answered)
+        SELECT users.id,
+               (SELECT COUNT(*) FROM questions WHERE questions.author_id = users.id),
+               (SELECT COUNT(*) FROM answers WHERE answers.user_id = users.id)
+        FROM users
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_question_pair_counts_recipient_id_count', table_name='question_pair_counts')
+    op.drop_index('ix_question_pair_counts_author_id_count', table_name='question_pair_counts')
+    op.drop_table('question_pair_counts')
+    op.drop_table('user_stats')
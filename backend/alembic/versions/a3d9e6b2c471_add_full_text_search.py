@@ -0,0 +1,47 @@
+"""Add generated search_vector columns with GIN indexes (Postgres only)
+
+Revision ID: a3d9e6b2c471
+Revises: f2a7c9e4b813
+Create Date: 2026-10-17 20:31:12.518904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9e6b2c471'
+down_revision: Union[str, None] = 'f2a7c9e4b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('answers', 'questions')
+
+
+def upgrade() -> None:
+    # Other dialects search with the in-memory fallback in app.core.search
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        # Adding a stored generated column rewrites the table once
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED"
+        )
+        op.create_index(
+            f'ix_{table}_search_vector',
+            table,
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
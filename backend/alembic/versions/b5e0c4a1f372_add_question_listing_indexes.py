@@ -0,0 +1,28 @@
+"""Add indexes for keyset pages of sent and received questions
+
+Revision ID: b5e0c4a1f372
+Revises: 9a2f6b3c7d15
+Create Date: 2026-10-17 12:26:04.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e0c4a1f372'
+down_revision: Union[str, None] = '9a2f6b3c7d15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_questions_author_id_created_at', 'questions', ['author_id', 'created_at'], unique=False)
+    op.create_index('ix_questions_recipient_id_created_at', 'questions', ['recipient_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_recipient_id_created_at', table_name='questions')
+    op.drop_index('ix_questions_author_id_created_at', table_name='questions')
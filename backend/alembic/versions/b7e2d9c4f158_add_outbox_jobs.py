@@ -0,0 +1,40 @@
+"""Add outbox_jobs for post-commit background jobs
+
+Revision ID: b7e2d9c4f158
+Revises: e4a8b2d7f610
+Create Date: 2026-10-17 23:12:08.514902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d9c4f158'
+down_revision: Union[str, None] = 'e4a8b2d7f610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox_jobs',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('kind', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('lease_id', sa.UUID(), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_outbox_jobs_available_at', 'outbox_jobs', ['available_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_jobs_available_at', table_name='outbox_jobs')
+    op.drop_table('outbox_jobs')
@@ -0,0 +1,28 @@
+"""Add user_stats.version and updated_at for HTTP validators
+
+Revision ID: c6b1f8d3e927
+Revises: a3d9e6b2c471
+Create Date: 2026-10-17 21:05:44.731260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6b1f8d3e927'
+down_revision: Union[str, None] = 'a3d9e6b2c471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_stats', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('user_stats', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user_stats', 'updated_at')
+    op.drop_column('user_stats', 'version')
@@ -0,0 +1,33 @@
+"""Add daily_assignments
+
+Revision ID: d8c3f1a6e254
+Revises: b5e0c4a1f372
+Create Date: 2026-10-17 15:12:09.481337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8c3f1a6e254'
+down_revision: Union[str, None] = 'b5e0c4a1f372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('daily_assignments',
+    sa.Column('user_id', sa.String(36), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('question_id', sa.String(36), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_assignments')
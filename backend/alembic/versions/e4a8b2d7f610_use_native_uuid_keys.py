@@ -0,0 +1,68 @@
+"""Move primary and foreign keys to the native uuid type (Postgres only)
+
+Revision ID: e4a8b2d7f610
+Revises: c6b1f8d3e927
+Create Date: 2026-10-17 21:48:09.264417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a8b2d7f610'
+down_revision: Union[str, None] = 'c6b1f8d3e927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY_COLUMNS = {
+    'users': ['id'],
+    'questions': ['id', 'author_id', 'recipient_id'],
+    'answers': ['id', 'question_id', 'user_id'],
+    'user_stats': ['user_id'],
+    'question_pair_counts': ['author_id', 'recipient_id'],
+    'daily_assignments': ['user_id', 'question_id'],
+}
+
+
+def _convert(new_type: str, cast: str) -> None:
+    # SQLite keeps the 36-character text form; app.db.types.GUID handles both
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # Both ends of a foreign key must change type together, so drop the
+    # constraints first and put them back afterwards
+    inspector = sa.inspect(bind)
+    foreign_keys = [
+        (table, fk)
+        for table in KEY_COLUMNS
+        for fk in inspector.get_foreign_keys(table)
+    ]
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+    for table, columns in KEY_COLUMNS.items():
+        op.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(
+                f"ALTER COLUMN {column} TYPE {new_type} USING {column}::{cast}"
+                for column in columns
+            )
+        )
+
+    for table, fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns'],
+        )
+
+
+def upgrade() -> None:
+    _convert('uuid', 'uuid')
+
+
+def downgrade() -> None:
+    _convert('varchar(36)', 'text')
@@ -0,0 +1,43 @@
+"""Add answers.answered_on with a once-per-day unique index
+
+Revision ID: f2a7c9e4b813
+Revises: d8c3f1a6e254
+Create Date: 2026-10-17 16:40:27.905126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a7c9e4b813'
+down_revision: Union[str, None] = 'd8c3f1a6e254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('answers', sa.Column('answered_on', sa.Date(), nullable=True))
+
+    # Treat each user's first answer of a day as that day's daily answer
+    op.execute("""
+        UPDATE answers SET answered_on = date(created_at)
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, date(created_at) ORDER BY created_at, id
+                ) AS rank
+                FROM answers
+                WHERE created_at IS NOT NULL
+            ) ranked
+            WHERE rank = 1
+        )
+    """)
+    op.create_index('uq_answers_user_id_answered_on', 'answers', ['user_id', 'answered_on'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_answers_user_id_answered_on', table_name='answers')
+    op.drop_column('answers', 'answered_on')
@@ -0,0 +1,36 @@
+"""Add directory_versions for the user listing's validators
+
+Revision ID: f5d2a8c6e391
+Revises: b7e2d9c4f158
+Create Date: 2026-10-18 10:41:27.306158
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5d2a8c6e391'
+down_revision: Union[str, None] = 'b7e2d9c4f158'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'directory_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute(
+        "INSERT INTO directory_versions (name, version, updated_at) "
+        "SELECT 'users', 1, max(created_at) FROM users"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('directory_versions')
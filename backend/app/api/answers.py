@@ -1,178 +1,285 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from app.api.deps import get_current_user, get_db
+import csv
+import io
+import logging
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app import crud
+from app.api.deps import (
+    get_async_db, get_async_sessionmaker, get_current_user_async, parse_cursor,
+    parse_search_cursor
+)
+from app.core.http_cache import PRIVATE_REVALIDATE, conditional_response, make_etag
+from app.core.pagination import MAX_PAGE_SIZE
+from app.core.responses import projected_response
 from app.models.user import User
 from app.models.answer import Answer as AnswerModel
-from app.schemas.answer import Answer, AnswerCreate
+from app.schemas.answer import Answer, AnswerCreate, NormalizedAnswers
+from app.schemas.page import Page
 from datetime import datetime
-from uuid import uuid4
+from uuid import UUID, uuid4
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/", response_model=Answer)
 async def create_answer(
-    request: Request,
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     answer_in: AnswerCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """
     Create new answer.
     """
     try:
-        # Log request details
-        print("\n=== Create Answer Debug ===")
-        print(f"Request URL: {request.url}")
-        print(f"Request method: {request.method}")
-        print(f"Request headers:")
-        for name, value in request.headers.items():
-            print(f"  {name}: {value}")
-        
-        body = await request.body()
-        print(f"Request body: {body.decode()}")
-        
-        print("\nUser Details:")
-        print(f"Current User ID: {current_user.id}")
-        print(f"Current User Email: {current_user.email}")
-        
-        print("\nAnswer Details:")
-        print(f"Question ID: {answer_in.question_id}")
-        print(f"Answer Text: {answer_in.text}")
-
         # Create answer
         db_answer = AnswerModel(
-            id=str(uuid4()),
+            id=uuid4(),
             text=answer_in.text,
-            question_id=str(answer_in.question_id),
-            user_id=str(current_user.id),
+            question_id=answer_in.question_id,
+            user_id=current_user.id,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
         
         db.add(db_answer)
-        db.commit()
-        db.refresh(db_answer)
-        
-        print("\nCreated Answer:")
-        print(f"ID: {db_answer.id}")
-        print(f"Text: {db_answer.text}")
-        print(f"Question ID: {db_answer.question_id}")
-        print(f"User ID: {db_answer.user_id}")
+        await crud.user_stats.record_answer_async(db, user_id=current_user.id)
+        await db.commit()
+        db_answer = await crud.answer.get_with_question_async(db, id=db_answer.id)
         
+        logger.debug(
+            "User %s created answer %s to question %s",
+            current_user.id, db_answer.id, db_answer.question_id
+        )
         return db_answer
         
     except Exception as e:
-        print(f"\nError in create_answer: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
-        db.rollback()
+        logger.exception("Error creating answer for user %s", current_user.id)
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Error creating answer: {str(e)}"
         )
 
-@router.get("/me", response_model=List[Answer])
-def get_user_answers(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+def _normalize(answers: List[Dict[str, Any]], next_cursor: Optional[str]) -> Dict[str, Any]:
+    """Move nested questions and authors out into side tables, once each."""
+    questions: Dict[Any, Dict[str, Any]] = {}
+    users: Dict[Any, Dict[str, Any]] = {}
+    for answer in answers:
+        question = answer.pop("question")
+        author = question.pop("author")
+        questions.setdefault(question["id"], question)
+        if author is not None:
+            users.setdefault(author["id"], author)
+    return {
+        "answers": answers,
+        "questions": list(questions.values()),
+        "users": list(users.values()),
+        "next_cursor": next_cursor,
+    }
+
+@router.get("/me", response_model=Union[List[Answer], Page[Answer], NormalizedAnswers])
+async def get_user_answers(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    shape: Literal["nested", "normalized"] = "nested",
+) -> Any:
+    """
+    Get all answers for the current user.
+
+    `shape=normalized` returns the answers without their nested question,
+    plus `questions` and `users` side tables listing each question and
+    author once, and `next_cursor` when paging with `cursor`.
+
+    Conditional: the ETag follows the user's version counter, so a
+    matching If-None-Match gets a 304 after one keyed read. Rows are
+    selected as plain columns and rendered by orjson without building
+    ORM objects or response models (app.core.responses).
+    """
+    user_id = current_user.id
+    version, updated_at = await crud.user_stats.get_version_async(db, user_id=user_id)
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag("answers", user_id, version, request.url.query),
+        last_modified=updated_at,
+        cache_control=PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
+    next_cursor = None
+    if cursor is not None:
+        answers, next_cursor = await crud.answer.get_rows_page_by_user_async(
+            db, user_id=user_id, after=parse_cursor(cursor), limit=limit
+        )
+    else:
+        answers = await crud.answer.get_multi_rows_by_user_async(
+            db, user_id=user_id, skip=skip, limit=limit
+        )
+    if shape == "normalized":
+        return projected_response(
+            _normalize(answers, next_cursor), schema=NormalizedAnswers, response=response
+        )
+    if cursor is not None:
+        return projected_response(
+            {"items": answers, "next_cursor": next_cursor}, schema=Page[Answer], response=response
+        )
+    return projected_response(answers, schema=List[Answer], response=response)
+
+@router.get("/search", response_model=Page[Answer])
+async def search_answers(
+    q: str = Query(..., min_length=1, max_length=256),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ) -> Any:
-    """Get all answers for the current user"""
-    answers = db.query(AnswerModel)\
-        .filter(AnswerModel.user_id == str(current_user.id))\
-        .order_by(AnswerModel.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    return answers
+    """
+    Full-text search over the current user's answers, best match first.
+
+    Pass `next_cursor` back as `cursor` for the next page.
+    """
+    answers, next_cursor = await crud.answer.search_by_user_async(
+        db, user_id=current_user.id, query=q, after=parse_search_cursor(cursor), limit=limit
+    )
+    return {"items": answers, "next_cursor": next_cursor}
 
 @router.get("/me/past", response_model=List[Answer])
-def get_my_answers(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_my_answers(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ) -> Any:
     """
     Get all answers for the current user
     """
     try:
-        print("\n=== Get My Answers Debug ===")
-        print(f"Current User ID: {current_user.id}")
-
-        answers = db.query(AnswerModel)\
-            .filter(AnswerModel.user_id == str(current_user.id))\
-            .order_by(AnswerModel.created_at.desc())\
-            .all()
-            
-        # Ensure question relationships are loaded
-        for answer in answers:
-            db.refresh(answer)
-            
-        print(f"\nFound {len(answers)} answers")
+        # Questions and their authors are loaded with the answers
+        answers = await crud.answer.get_multi_by_user_async(
+            db, user_id=current_user.id, limit=None
+        )
+        logger.debug("Found %d answers for user %s", len(answers), current_user.id)
         return [Answer.from_orm(answer) for answer in answers]
 
     except Exception as e:
-        print(f"\nError in get_my_answers: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error retrieving answers for user %s", current_user.id)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving answers: {str(e)}"
         )
 
+EXPORT_CSV_COLUMNS = [
+    "answer_id", "answered_at", "updated_at", "answer",
+    "question_id", "question", "asked_by", "asked_at",
+]
+
+def _csv_rows(answers: List[AnswerModel]) -> List[list]:
+    rows = []
+    for answer in answers:
+        question = answer.question
+        author = question.author if question else None
+        rows.append([
+            answer.id,
+            answer.created_at.isoformat() if answer.created_at else "",
+            answer.updated_at.isoformat() if answer.updated_at else "",
+            answer.text,
+            answer.question_id,
+            question.text if question else "",
+            (author.full_name or author.email) if author else "",
+            question.created_at.isoformat() if question and question.created_at else "",
+        ])
+    return rows
+
+@router.get("/me/export")
+async def export_my_answers(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: User = Depends(get_current_user_async),
+    session_factory: async_sessionmaker = Depends(get_async_sessionmaker),
+) -> StreamingResponse:
+    """
+    Stream the current user's whole journal, oldest first, as NDJSON (one
+    Answer object per line) or CSV.
+
+    Answers are read in batches from a server-side cursor and written out
+    as they arrive, so memory use doesn't grow with the journal.
+    """
+    user_id = current_user.id
+
+    async def body() -> AsyncIterator[str]:
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_CSV_COLUMNS)
+            yield buffer.getvalue()
+        # The request's session is closed before the body is sent
+        async with session_factory() as db:
+            try:
+                async for batch in crud.answer.stream_by_user_async(db, user_id=user_id):
+                    if format == "csv":
+                        buffer.seek(0)
+                        buffer.truncate()
+                        writer.writerows(_csv_rows(batch))
+                        yield buffer.getvalue()
+                    else:
+                        yield "".join(
+                            Answer.model_validate(answer).model_dump_json() + "\n"
+                            for answer in batch
+                        )
+            except Exception:
+                # Headers are already sent; all we can do is cut the stream short
+                logger.exception("Journal export failed for user %s", user_id)
+                raise
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"journal-{datetime.utcnow().date().isoformat()}.{format}"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @router.put("/{answer_id}", response_model=Answer)
 async def update_answer(
-    request: Request,
-    answer_id: str,
+    answer_id: UUID,
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     answer_in: AnswerCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """
     Update an existing answer.
     """
     try:
-        print("\n=== Update Answer Debug ===")
-        print(f"Answer ID: {answer_id}")
-        print(f"Current User ID: {current_user.id}")
-        print(f"New Answer Text: {answer_in.text}")
-
         # Get existing answer
-        db_answer = db.query(AnswerModel).filter(AnswerModel.id == answer_id).first()
+        db_answer = await crud.answer.get_with_question_async(db, id=answer_id)
         if not db_answer:
             raise HTTPException(status_code=404, detail="Answer not found")
             
         # Verify ownership
-        if str(db_answer.user_id) != str(current_user.id):
+        if db_answer.user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to edit this answer")
 
         # Update answer
         db_answer.text = answer_in.text
         db_answer.updated_at = datetime.utcnow()
+        await crud.user_stats.touch_async(db, user_id=current_user.id)
+
+        await db.commit()
         
-        db.commit()
-        db.refresh(db_answer)
-        
-        print("\nUpdated Answer:")
-        print(f"ID: {db_answer.id}")
-        print(f"Text: {db_answer.text}")
-        print(f"Updated At: {db_answer.updated_at}")
-        
+        logger.debug("User %s updated answer %s", current_user.id, answer_id)
         return db_answer
         
     except HTTPException as he:
         raise he
     except Exception as e:
-        print(f"\nError in update_answer: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
-        db.rollback()
+        logger.exception("Error updating answer %s", answer_id)
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Error updating answer: {str(e)}"
@@ -1,27 +1,43 @@
+import logging
 from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import crud
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user_async, limit_by_ip
 from app.core import security
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserCreate
 from app.schemas.token import Token
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
-@router.post("/token", response_model=Token)
-def login_access_token(
-    db: Session = Depends(get_db),
+def _hasher_busy() -> HTTPException:
+    logger.warning("Password hasher queue full, shedding request")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+@router.post(
+    "/token", response_model=Token, dependencies=[Depends(limit_by_ip("auth.token"))]
+)
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """OAuth2 compatible token login, get an access token for future requests."""
-    user = crud.user.authenticate(
-        db, email=form_data.username, password=form_data.password
-    )
+    try:
+        user = await crud.user.authenticate_async(
+            db, email=form_data.username, password=form_data.password
+        )
+    except security.PasswordHasherBusy:
+        raise _hasher_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,18 +57,18 @@ def login_access_token(
         "token_type": "bearer",
     }
 
-@router.post("/register", response_model=UserSchema)
+@router.post(
+    "/register", response_model=UserSchema, dependencies=[Depends(limit_by_ip("auth.register"))]
+)
 async def register_user(
     user_in: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """Register a new user."""
-    print(f"Registering user with email: {user_in.email}")  # Debug log
-    
     # Check if user already exists
-    user = crud.user.get_by_email(db, email=user_in.email)
+    user = await crud.user.get_by_email_async(db, email=user_in.email)
     if user:
-        print(f"User already exists: {user_in.email}")  # Debug log
+        logger.debug("Registration rejected: email already in use")
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
@@ -60,19 +76,21 @@ async def register_user(
     
     try:
         # Create new user
-        user = crud.user.create(db, obj_in=user_in)
-        print(f"Successfully created user: {user.email}")  # Debug log
+        user = await crud.user.create_async(db, obj_in=user_in)
+        logger.info("Registered user %s", user.id)
         return user
+    except security.PasswordHasherBusy:
+        raise _hasher_busy()
     except Exception as e:
-        print(f"Error creating user: {str(e)}")  # Debug log
+        logger.exception("Error creating user")
         raise HTTPException(
             status_code=500,
             detail=f"Error creating user: {str(e)}",
         )
 
 @router.get("/me", response_model=UserSchema)
-def read_current_user(
-    current_user: User = Depends(get_current_user),
+async def read_current_user(
+    current_user: User = Depends(get_current_user_async),
 ) -> Any:
     """Get current user."""
     return current_user
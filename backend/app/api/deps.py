@@ -1,38 +1,140 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+import logging
+from typing import AsyncGenerator, Callable, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app import crud, models, schemas
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.pagination import Cursor, SearchCursor, decode_cursor, decode_search_cursor
+from app.core.rate_limit import get_rate_limit_store, rate_limits, retry_after
+from app.db.session import AsyncSessionLocal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
 
-def get_db() -> Generator:
-    try:
-        db = SessionLocal()
+logger = logging.getLogger(__name__)
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    The request's session. FastAPI caches dependencies per request, so
+    get_current_user_async and the handler share this one session, and
+    with it at most one pooled connection.
+
+    The session only checks a connection out at its first query and hands
+    it back when the transaction ends or the session closes, so a request
+    answered entirely from the user cache holds none.
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> models.User:
+def get_async_sessionmaker() -> async_sessionmaker:
+    """
+    Session factory for work that outlives the request's dependencies.
+
+    FastAPI closes yield dependencies before a StreamingResponse body is
+    sent, so streaming endpoints open their own session from this.
+    """
+    return AsyncSessionLocal
+
+def decode_token(token: str) -> schemas.TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=["HS256"]
         )
-        token_data = schemas.TokenPayload(**payload)
+        return schemas.TokenPayload(**payload)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
-    user = crud.user.get_by_email(db, email=token_data.sub)
+
+def parse_cursor(cursor: str) -> Optional[Cursor]:
+    """An empty cursor asks for the first keyset page."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_search_cursor(cursor: Optional[str]) -> Optional[SearchCursor]:
+    if not cursor:
+        return None
+    try:
+        return decode_search_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> models.User:
+    token_data = decode_token(token)
+    user = await crud.user.get_by_email_cached_async(db, email=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+async def get_current_user_stream_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = None,
+) -> models.User:
+    """
+    get_current_user_async for event streams. A browser's EventSource can't
+    set headers, so the token may also come as the `access_token` query
+    parameter; clients that can send the header should.
+    """
+    token = token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user_async(db, token)
+
+def client_ip(request: Request) -> str:
+    """
+    The client's address. Behind TRUSTED_PROXY_HOPS proxies it's the entry
+    that many from the end of X-Forwarded-For, the last one a trusted proxy
+    wrote; anything before it is whatever the client claimed.
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [ip for ip in forwarded if ip]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+async def _enforce_rate_limit(name: str, key: str, store) -> None:
+    limit = rate_limits.get(name)
+    if limit is None or not settings.RATE_LIMIT_ENABLED:
+        return
+    wait = await store.take(f"{name}:{key}", limit)
+    if wait > 0:
+        logger.info("Rate limited", extra={"limit": name, "retry_after": wait})
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": retry_after(wait)},
+        )
+
+def limit_by_ip(name: str) -> Callable:
+    """Dependency enforcing the `name` rate limit per client IP."""
+    async def dependency(request: Request, store=Depends(get_rate_limit_store)) -> None:
+        await _enforce_rate_limit(name, client_ip(request), store)
+    return dependency
+
+def limit_by_user(name: str) -> Callable:
+    """Dependency enforcing the `name` rate limit per authenticated user."""
+    async def dependency(
+        current_user: models.User = Depends(get_current_user_async),
+        store=Depends(get_rate_limit_store),
+    ) -> None:
+        await _enforce_rate_limit(name, str(current_user.id), store)
+    return dependency
@@ -1,209 +1,225 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from app import crud
-from app.api.deps import get_current_user
-from app.db.base import get_db
+from app.api.deps import (
+    get_async_db, get_async_sessionmaker, get_current_user_async,
+    get_current_user_stream_async, limit_by_user, parse_cursor, parse_search_cursor
+)
+from app.core.config import settings
+from app.core.http_cache import PRIVATE_REVALIDATE, conditional_response, make_etag
+from app.core.notifications import broadcaster, notify_new_questions_async
+from app.core.pagination import MAX_PAGE_SIZE, Cursor, decode_cursor, encode_cursor
+from app.core.responses import projected_response
 from app.models.user import User
 from app.models.question import Question as QuestionModel
-from app.models.answer import Answer as AnswerModel
-from app.schemas.question import Question, QuestionCreate
+from app.schemas.question import Question, QuestionBulkCreate, QuestionCreate
 from app.schemas.answer import Answer, AnswerCreate
+from app.schemas.page import Page
 from datetime import datetime, timedelta
-import uuid
+from uuid import UUID, uuid4
 import random
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+# Event stream reconnect delay (EventSource's `retry`), and replay batch size
+STREAM_RETRY_MS = 5000
+STREAM_REPLAY_BATCH = 100
+# Before any received question; a stream's position when it has none
+STREAM_START = Cursor(datetime(1970, 1, 1), str(UUID(int=0)))
+
 @router.get("/daily", response_model=Question)
-def get_daily_question(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_daily_question(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """
-    Get an unanswered question for the current user
+    Get the current user's question for today.
+
+    Normally a primary-key read of the row written by the daily assignment
+    job; users without one (e.g. new questions since the job ran) are
+    assigned on first request. Conditional on the user's version counter
+    and the date.
     """
+    today = datetime.utcnow().date()
+    version, updated_at = await crud.user_stats.get_version_async(db, user_id=current_user.id)
+    midnight = datetime.combine(today, datetime.min.time())
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag("daily", current_user.id, version, today),
+        last_modified=max(updated_at, midnight) if updated_at else midnight,
+        cache_control=PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
     try:
-        print("\n=== Daily Question Debug ===")
-        print(f"Current User ID: {current_user.id}")
-        print(f"Current User Email: {current_user.email}")
-
-        # Check if user has already answered a question today
-        today = datetime.utcnow().date()
-        existing_answer = crud.answer.get_by_user_and_date(
-            db, user_id=str(current_user.id), date=today
+        found = await crud.daily_assignment.get_for_user_async(
+            db, user_id=current_user.id, day=today
         )
-        if existing_answer:
-            print("\nUser has already answered a question today")
-            raise HTTPException(status_code=404, detail="You have already answered today's question")
+        if found is None:
+            # Check if user has already answered a daily question today
+            if await crud.answer.has_daily_answer_async(db, user_id=current_user.id, day=today):
+                logger.debug("User %s has already answered today", current_user.id)
+                raise HTTPException(status_code=404, detail="You have already answered today's question")
 
-        # Get any unanswered question for this user with author details
-        question = db.query(QuestionModel)\
-            .filter(
-                QuestionModel.recipient_id == str(current_user.id),
-                QuestionModel.is_answered == False
-            )\
-            .join(User, QuestionModel.author_id == User.id)\
-            .first()
-        
-        if not question:
-            print("No unanswered questions found for user")
+            await crud.daily_assignment.assign_user_async(db, user_id=current_user.id, day=today)
+            found = await crud.daily_assignment.get_for_user_async(
+                db, user_id=current_user.id, day=today
+            )
+
+        if not found:
+            logger.debug("No unanswered questions for user %s", current_user.id)
             raise HTTPException(status_code=404, detail="No questions available")
-            
-        print("\nFound Question:")
-        print(f"ID: {question.id}")
-        print(f"Text: {question.text}")
-        print(f"Author ID: {question.author_id}")
-        print(f"Author Name: {question.author.full_name if question.author else 'Unknown'}")
-        print(f"Recipient ID: {question.recipient_id}")
-        print(f"Is Daily: {question.is_daily_question}")
-        print(f"Is Answered: {question.is_answered}")
-        print(f"Created At: {question.created_at}")
-
-        print("\nAttempting to convert to schema...")
-        schema = Question.from_orm(question)
-        print("Successfully converted to schema!")
-        
-        return schema
+
+        assignment, answered_today = found
+        question = assignment.question
+        if answered_today or question.is_answered:
+            logger.debug("User %s has already answered today", current_user.id)
+            raise HTTPException(status_code=404, detail="You have already answered today's question")
+
+        logger.debug(
+            "Daily question %s for user %s from author %s",
+            question.id, current_user.id, question.author_id
+        )
+        return Question.from_orm(question)
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"\nError in get_daily_question: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("Error retrieving daily question for user %s", current_user.id)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving daily question: {str(e)}"
         )
 
 @router.post("/daily/{question_id}/answer", response_model=Answer)
-def answer_daily_question(
-    question_id: str,
+async def answer_daily_question(
+    question_id: UUID,
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     answer_in: AnswerCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
-    """Submit an answer to the daily question."""
+    """
+    Submit an answer to the daily question.
+
+    One transaction: a conditional UPDATE claims the question and an INSERT
+    adds the answer. The once-per-day rule is a unique index, so concurrent
+    submits can't both get through.
+    """
+    # Read before any rollback expires current_user
+    user_id = current_user.id
     try:
-        print("\n=== Answer Daily Question Debug ===")
-        print(f"Question ID: {question_id}")
-        print(f"Current User ID: {current_user.id}")
-        print(f"Answer Text: {answer_in.text}")
-
-        # Verify the question exists and is assigned to the current user
-        question = crud.question.get(db, id=question_id)
-        print(f"\nQuestion found: {question is not None}")
-        if question:
-            print(f"Question recipient_id: {question.recipient_id}")
-            print(f"Question is_answered: {question.is_answered}")
-        
-        if not question:
-            print("\nError: Question not found")
-            raise HTTPException(status_code=404, detail="Question not found")
-        if str(question.recipient_id) != str(current_user.id):
-            print("\nError: Not authorized")
-            print(f"Question recipient_id: {question.recipient_id}")
-            print(f"Current user id: {current_user.id}")
-            raise HTTPException(status_code=403, detail="Not authorized to answer this question")
-        if question.is_answered:
-            print("\nError: Question already answered")
+        db_answer = await crud.answer.answer_daily_async(
+            db, question_id=question_id, user_id=user_id, text=answer_in.text
+        )
+        if db_answer is None:
+            await db.rollback()
+            # Work out why the claim failed; only rejected submits pay for this
+            question = await crud.question.get_async(db, question_id)
+            if not question:
+                raise HTTPException(status_code=404, detail="Question not found")
+            if question.recipient_id != user_id:
+                raise HTTPException(status_code=403, detail="Not authorized to answer this question")
             raise HTTPException(status_code=400, detail="This question has already been answered")
 
-        # Check if user has already answered a question today
-        today = datetime.utcnow().date()
-        existing_answer = crud.answer.get_by_user_and_date(
-            db, user_id=str(current_user.id), date=today
-        )
-        print(f"\nExisting answer today: {existing_answer is not None}")
-        if existing_answer:
-            print("\nError: Already answered today")
-            raise HTTPException(
-                status_code=400,
-                detail="You have already answered a question today"
-            )
+        await crud.user_stats.record_answer_async(db, user_id=user_id)
+        await db.commit()
 
-        print("\nCreating answer...")
-        # Create the answer
-        db_answer = AnswerModel(
-            id=str(uuid.uuid4()),
-            question_id=question_id,
-            user_id=str(current_user.id),
-            text=answer_in.text,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+        logger.debug(
+            "User %s answered question %s with answer %s",
+            user_id, question_id, db_answer.id
         )
-        print(f"Answer ID: {db_answer.id}")
-        print(f"Question ID: {db_answer.question_id}")
-        print(f"User ID: {db_answer.user_id}")
-        
-        # Mark the question as answered
-        print("\nMarking question as answered...")
-        question.is_answered = True
-        
-        db.add(db_answer)
-        db.commit()
-        db.refresh(db_answer)
-        
-        print("\nAnswer created successfully!")
         return Answer.from_orm(db_answer)
-        
+
+    except IntegrityError:
+        await db.rollback()
+        logger.debug("User %s already answered a question today", user_id)
+        raise HTTPException(
+            status_code=400,
+            detail="You have already answered a question today"
+        )
     except HTTPException as e:
-        print(f"\nHTTP Exception: {e.detail}")
+        logger.debug("Answer to question %s rejected: %s", question_id, e.detail)
         raise e
     except Exception as e:
-        print(f"\nError in answer_daily_question: {str(e)}")
-        print(f"Error type: {type(e)}")
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")
-        db.rollback()
+        logger.exception("Error answering question %s", question_id)
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Error creating answer: {str(e)}"
         )
 
-@router.get("/", response_model=List[Question])
-def get_questions(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=Union[List[Question], Page[Question]])
+async def get_questions(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """
     Retrieve questions.
+
+    Pass `cursor` (empty for the first page) to get keyset pages with a
+    `next_cursor` instead of a plain skip/limit list.
     """
-    questions = crud.question.get_multi(db, skip=skip, limit=limit)
+    if cursor is not None:
+        questions, next_cursor = await crud.question.get_page_async(
+            db,
+            after=parse_cursor(cursor),
+            limit=limit,
+            options=crud.question.with_author
+        )
+        return {"items": questions, "next_cursor": next_cursor}
+    questions = await crud.question.get_multi_async(db, skip=skip, limit=limit)
     return questions
 
-@router.post("/user-question", response_model=Question)
-@router.post("/user-question/{recipient_id}", response_model=Question)
-def create_user_question(
-    recipient_id: str,
+@router.post(
+    "/user-question", response_model=Question,
+    dependencies=[Depends(limit_by_user("questions.create"))]
+)
+@router.post(
+    "/user-question/{recipient_id}", response_model=Question,
+    dependencies=[Depends(limit_by_user("questions.create"))]
+)
+async def create_user_question(
+    recipient_id: UUID,
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     question_in: QuestionCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """
     Create a new question from one user to another.
     """
     try:
         # Create the question directly in the database using the model
-        question_id = str(uuid.uuid4())
+        question_id = uuid4()
         db_question = QuestionModel(
             id=question_id,
             text=question_in.text,
-            author_id=str(current_user.id),
-            recipient_id=str(recipient_id),
+            author_id=current_user.id,
+            recipient_id=recipient_id,
             is_daily_question=False,
             created_at=datetime.utcnow()
         )
         
         db.add(db_question)
-        db.commit()
-        db.refresh(db_question)
+        await crud.user_stats.record_questions_async(
+            db, pairs=[(db_question.author_id, db_question.recipient_id)]
+        )
+        await notify_new_questions_async(db, [(recipient_id, question_id)])
+        await db.commit()
+        await db.refresh(db_question)
         
         # Manually create the response schema
         return Question(
@@ -216,42 +232,208 @@ def create_user_question(
         )
         
     except Exception as e:
-        print(f"Error creating question: {str(e)}")
-        db.rollback()
+        logger.exception("Error creating question for recipient %s", recipient_id)
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Error creating question: {str(e)}"
         )
 
-@router.get("/received", response_model=List[Question])
-def get_received_questions(
-    db: Session = Depends(get_db),
+@router.post(
+    "/bulk", response_model=List[Question],
+    dependencies=[Depends(limit_by_user("questions.bulk"))]
+)
+async def create_questions_bulk(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    bulk_in: QuestionBulkCreate,
+    current_user: User = Depends(get_current_user_async)
+) -> Any:
+    """
+    Create many questions from the current user in one request.
+
+    Send `text` with `recipient_ids` to ask everyone the same thing, and/or a
+    list of `questions`, each with its own `recipient_id` and `text`.
+    """
+    items = [(recipient_id, bulk_in.text) for recipient_id in bulk_in.recipient_ids]
+    if bulk_in.recipient_ids and not bulk_in.text:
+        raise HTTPException(status_code=400, detail="text is required with recipient_ids")
+    items += [(item.recipient_id, item.text) for item in bulk_in.questions]
+    if not items:
+        raise HTTPException(status_code=400, detail="No questions to create")
+    if len(items) > settings.QUESTION_BULK_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.QUESTION_BULK_MAX} questions per request"
+        )
+
+    author_id = current_user.id
+    try:
+        questions = await crud.question.create_many_async(db, author=current_user, items=items)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Unknown recipient")
+    except Exception as e:
+        logger.exception("Error creating %d questions", len(items))
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error creating questions: {str(e)}"
+        )
+
+    logger.info("User %s sent %d questions", author_id, len(questions))
+    return questions
+
+@router.get("/received", response_model=Union[List[Question], Page[Question]])
+async def get_received_questions(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """
     Retrieve questions received by the current user.
+
+    Served from plain column rows rendered by orjson, without ORM objects
+    or response model validation (app.core.responses).
     """
-    questions = crud.question.get_user_received_questions(
-        db, 
+    if cursor is not None:
+        questions, next_cursor = await crud.question.get_received_rows_page_async(
+            db, user_id=current_user.id, after=parse_cursor(cursor), limit=limit
+        )
+        return projected_response(
+            {"items": questions, "next_cursor": next_cursor}, schema=Page[Question]
+        )
+    questions = await crud.question.get_received_rows_async(
+        db,
         user_id=current_user.id,
         skip=skip,
         limit=limit
     )
-    return questions
+    return projected_response(questions, schema=List[Question])
+
+def _question_event(row: Dict[str, Any]) -> str:
+    data = Question.model_validate(row).model_dump_json()
+    return f"id: {encode_cursor(row['created_at'], row['id'])}\nevent: question\ndata: {data}\n\n"
 
-@router.get("/sent", response_model=List[Question])
-def get_sent_questions(
-    db: Session = Depends(get_db),
+@router.get("/stream")
+async def stream_received_questions(
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user_stream_async),
+    session_factory: async_sessionmaker = Depends(get_async_sessionmaker),
+) -> StreamingResponse:
+    """
+    Server-Sent Events: a `question` event, with a Question object as its
+    data, for each question sent to the current user, pushed as soon as
+    it's committed. Use instead of polling /questions/received.
+
+    Event ids are positions in the user's received questions. EventSource
+    reconnects by itself and sends the last id as Last-Event-ID; the stream
+    then starts with whatever arrived in between. A first connection gets
+    an id-only message, so even its first reconnect has a position.
+
+    A comment every STREAM_HEARTBEAT_SECONDS keeps proxies from dropping an
+    idle stream, and it ends after STREAM_MAX_SECONDS (the client simply
+    reconnects). An idle stream holds no database connection.
+    """
+    user_id = current_user.id
+    try:
+        after = decode_cursor(last_event_id) if last_event_id else None
+    except ValueError:
+        # Refusing would stop EventSource for good; start afresh instead
+        after = None
+
+    async def events() -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.STREAM_MAX_SECONDS
+        replayed: Set[str] = set()
+        # Subscribed before reading, so nothing committed meanwhile is missed
+        with broadcaster.subscribe(user_id) as subscription:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            if after is None:
+                async with session_factory() as db:
+                    position = await crud.question.get_latest_received_cursor_async(
+                        db, user_id=user_id
+                    )
+                position = position or STREAM_START
+                yield f"id: {encode_cursor(position.created_at, position.id)}\n\n"
+            else:
+                position = after
+                while True:
+                    async with session_factory() as db:
+                        rows = await crud.question.get_received_rows_since_async(
+                            db, user_id=user_id, after=position, limit=STREAM_REPLAY_BATCH
+                        )
+                    for row in rows:
+                        replayed.add(str(row["id"]))
+                        yield _question_event(row)
+                    if len(rows) < STREAM_REPLAY_BATCH:
+                        break
+                    position = Cursor(rows[-1]["created_at"], str(rows[-1]["id"]))
+
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                question_ids = await subscription.next(
+                    timeout=min(settings.STREAM_HEARTBEAT_SECONDS, remaining)
+                )
+                if question_ids is None:
+                    return
+                question_ids = [id for id in question_ids if id not in replayed]
+                if not question_ids:
+                    yield ": keep-alive\n\n"
+                    continue
+                async with session_factory() as db:
+                    rows = await crud.question.get_received_rows_by_ids_async(
+                        db, user_id=user_id, ids=question_ids
+                    )
+                for row in rows:
+                    yield _question_event(row)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/search", response_model=Page[Question])
+async def search_questions(
+    q: str = Query(..., min_length=1, max_length=256),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+) -> Any:
+    """
+    Full-text search over questions the current user has received or
+    asked, best match first.
+
+    Pass `next_cursor` back as `cursor` for the next page.
+    """
+    questions, next_cursor = await crud.question.search_for_user_async(
+        db, user_id=current_user.id, query=q, after=parse_search_cursor(cursor), limit=limit
+    )
+    return {"items": questions, "next_cursor": next_cursor}
+
+@router.get("/sent", response_model=Union[List[Question], Page[Question]])
+async def get_sent_questions(
+    db: AsyncSession = Depends(get_async_db),
     skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """
     Retrieve questions sent by the current user.
     """
-    questions = crud.question.get_user_sent_questions(
+    if cursor is not None:
+        questions, next_cursor = await crud.question.get_sent_page_async(
+            db, user_id=current_user.id, after=parse_cursor(cursor), limit=limit
+        )
+        return {"items": questions, "next_cursor": next_cursor}
+    questions = await crud.question.get_user_sent_questions_async(
         db,
         user_id=current_user.id,
         skip=skip,
@@ -1,98 +1,75 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import crud
-from app.api.deps import get_current_user
-from app.db.base import get_db
+from app.api.deps import get_async_db, get_current_user_async, parse_cursor
+from app.core.http_cache import (
+    PRIVATE_REVALIDATE, PRIVATE_SHORT, conditional_response, make_etag
+)
+from app.core.pagination import MAX_PAGE_SIZE
 from app.models.user import User
-from app.models.question import Question
-from app.models.answer import Answer
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
 from app.schemas.stats import UserStats, UserInteractionStats
+from app.schemas.page import Page
 
 router = APIRouter()
 
-@router.get("/", response_model=List[UserSchema])
-def get_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/", response_model=Union[List[UserSchema], Page[UserSchema]])
+async def get_users(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve users.
+
+    Conditional on the user directory's version, which every user write bumps.
     """
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
+    version, updated_at = await crud.user.get_directory_version_async(db)
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag("users", version, request.url.query),
+        last_modified=updated_at,
+        cache_control=PRIVATE_SHORT,
+    )
+    if not_modified:
+        return not_modified
+    if cursor is not None:
+        users, next_cursor = await crud.user.get_page_async(
+            db, after=parse_cursor(cursor), limit=limit
+        )
+        return {"items": users, "next_cursor": next_cursor}
+    users = await crud.user.get_multi_async(db, skip=skip, limit=limit)
     return users
 
 @router.get("/me/stats", response_model=UserStats)
-def get_user_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_user_stats(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """Get statistics for the current user"""
-    # Get questions asked count
-    questions_asked = db.query(Question)\
-        .filter(Question.author_id == str(current_user.id))\
-        .count()
-
-    # Get questions answered count
-    questions_answered = db.query(Answer)\
-        .filter(Answer.user_id == str(current_user.id))\
-        .count()
-
-    # Get top 3 people user asked questions to
-    top_asked = db.query(
-        Question.recipient_id,
-        User.full_name,
-        User.email,
-        func.count(Question.id).label('count')
-    )\
-        .join(User, Question.recipient_id == User.id)\
-        .filter(Question.author_id == str(current_user.id))\
-        .group_by(Question.recipient_id, User.full_name, User.email)\
-        .order_by(func.count(Question.id).desc())\
-        .limit(3)\
-        .all()
-
-    # Get top 3 people who asked questions to user
-    top_received = db.query(
-        Question.author_id,
-        User.full_name,
-        User.email,
-        func.count(Question.id).label('count')
-    )\
-        .join(User, Question.author_id == User.id)\
-        .filter(Question.recipient_id == str(current_user.id))\
-        .group_by(Question.author_id, User.full_name, User.email)\
-        .order_by(func.count(Question.id).desc())\
-        .limit(3)\
-        .all()
-
-    return {
-        "questions_asked": questions_asked,
-        "questions_answered": questions_answered,
-        "top_asked": [
-            {
-                "user_id": str(user_id),
-                "name": full_name or email,
-                "count": count
-            } for user_id, full_name, email, count in top_asked
-        ],
-        "top_received": [
-            {
-                "user_id": str(user_id),
-                "name": full_name or email,
-                "count": count
-            } for user_id, full_name, email, count in top_received
-        ]
-    }
+    user_id = current_user.id
+    version, updated_at = await crud.user_stats.get_version_async(db, user_id=user_id)
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag("stats", user_id, version),
+        last_modified=updated_at,
+        cache_control=PRIVATE_REVALIDATE,
+    )
+    if not_modified:
+        return not_modified
+    # Counters are maintained on write, so this is one keyed read
+    return await crud.user_stats.get_for_user_async(db, user_id=user_id)
 
 @router.get("/me", response_model=UserSchema)
-def read_user_me(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def read_user_me(
+    current_user: User = Depends(get_current_user_async)
 ) -> Any:
     """Get current user."""
     return current_user
@@ -0,0 +1,169 @@
+import hmac
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+
+from fastapi import FastAPI, Header, Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.session import async_engine, engine
+
+registry = CollectorRegistry()
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    ["method", "route", "status"],
+    registry=registry,
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+    registry=registry,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in SQL statements per request",
+    ["method", "route"],
+    registry=registry,
+)
+
+
+class _QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set per request by the middleware; SQLAlchemy's async greenlets inherit
+# the request's context, so both sync and async engines report into it.
+_query_stats: ContextVar[Optional[_QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements and time spent in them for the current request."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class PoolCollector:
+    """Reads connection pool gauges from the engines at scrape time."""
+
+    def __init__(self, engines: Dict[str, Engine]) -> None:
+        self.engines = engines
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        gauges = {
+            "size": GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"]),
+            "checkedout": GaugeMetricFamily(
+                "db_pool_checked_out", "Connections currently checked out", labels=["engine"]
+            ),
+            "checkedin": GaugeMetricFamily(
+                "db_pool_checked_in", "Idle connections in the pool", labels=["engine"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "db_pool_overflow", "Connections open beyond pool_size", labels=["engine"]
+            ),
+        }
+        for name, eng in self.engines.items():
+            pool = eng.pool
+            for attr, gauge in gauges.items():
+                # NullPool/StaticPool (tests, SQLite) don't track these
+                if hasattr(pool, attr):
+                    gauge.add_metric([name], getattr(pool, attr)())
+        return list(gauges.values())
+
+
+class MetricsMiddleware:
+    """
+    Records latency, query count and query time for every HTTP request,
+    labelled by the matched route template rather than the raw path.
+    """
+
+    def __init__(self, app: ASGIApp, skip_paths: Iterable[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = _QueryStats()
+        token = _query_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _query_stats.reset(token)
+            # The router fills in scope["route"] once a route has matched
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route_label, str(status_code)).observe(elapsed)
+            REQUEST_QUERIES.labels(method, route_label).observe(stats.count)
+            REQUEST_DB_TIME.labels(method, route_label).observe(stats.seconds)
+
+
+_pool_collector = PoolCollector({"sync": engine, "async": async_engine.sync_engine})
+registry.register(_pool_collector)
+
+
+def scrape_allowed(authorization: Optional[str]) -> bool:
+    """
+    With METRICS_TOKEN set, a scrape must send it as a bearer token;
+    without one, /metrics is only served in development.
+    """
+    if not settings.METRICS_TOKEN:
+        return settings.ENVIRONMENT == "development"
+    scheme, _, token = (authorization or "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    )
+
+
+def install_metrics(app: FastAPI) -> None:
+    """Add the middleware, the /metrics endpoint and engine hooks to `app`."""
+    for instrumented in _pool_collector.engines.values():
+        instrument_engine(instrumented)
+
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(authorization: Optional[str] = Header(None)) -> Response:
+        if not scrape_allowed(authorization):
+            if not settings.METRICS_TOKEN:
+                return Response(status_code=404)
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,271 @@
+"""
+New-question notifications for the /questions/stream event streams.
+
+A write calls notify_new_questions_async() inside its transaction, and
+the recipients' open streams hear about it once that commits:
+
+    Postgres   the notification is a pg_notify() in the transaction, which
+               Postgres delivers at commit to every worker LISTENing on
+               CHANNEL (QuestionListener); each passes it to its broadcaster.
+    otherwise  (SQLite, tests) it waits in the session's info and goes to
+               this process's broadcaster from an after_commit hook.
+
+Either way a rolled-back write notifies no one. Notifications carry only
+question ids; streams load the questions themselves.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Text, event, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "new_questions"
+
+# Ids per NOTIFY payload, well inside Postgres' 8000-byte limit
+_IDS_PER_PAYLOAD = 100
+
+
+class Subscription:
+    """One stream's view of its user's notifications."""
+
+    def __init__(self, user_id: str, max_pending: int) -> None:
+        self.user_id = user_id
+        self.max_pending = max_pending
+        self.closed = False
+        self._pending: Deque[str] = deque()
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+
+    def _call(self, callback, *args) -> None:
+        # Notifications arrive from whichever thread committed
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:  # the stream's loop is gone
+            pass
+
+    def put(self, question_ids: List[str]) -> None:
+        self._call(self._put, question_ids)
+
+    def _put(self, question_ids: List[str]) -> None:
+        if len(self._pending) + len(question_ids) > self.max_pending:
+            # A stream this far behind is cut; the client reconnects with
+            # Last-Event-ID and catches up from the database
+            self._close()
+            return
+        self._pending.extend(question_ids)
+        self._ready.set()
+
+    def close(self) -> None:
+        self._call(self._close)
+
+    def _close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[List[str]]:
+        """
+        Question ids notified since the last call, waiting up to `timeout`
+        seconds for some; [] if none came, None once the subscription is closed.
+        """
+        if not self._pending and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._ready.clear()
+        if self.closed:
+            return None
+        question_ids = list(self._pending)
+        self._pending.clear()
+        return question_ids
+
+
+class Broadcaster:
+    """This process's subscriptions, by user id."""
+
+    def __init__(self) -> None:
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, user_id: UUID) -> Iterator[Subscription]:
+        subscription = Subscription(str(user_id), settings.STREAM_MAX_PENDING)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscriptions = self._subscriptions[subscription.user_id]
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def dispatch(self, user_id: str, question_ids: List[str]) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(question_ids)
+
+    def close_all(self) -> None:
+        """End every stream; clients reconnect and replay what they missed."""
+        with self._lock:
+            subscriptions = [s for group in self._subscriptions.values() for s in group]
+        for subscription in subscriptions:
+            subscription.close()
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(group) for group in self._subscriptions.values())
+
+
+broadcaster = Broadcaster()
+
+
+def _payloads(questions: Iterable[Tuple[UUID, UUID]]) -> List[str]:
+    """(recipient_id, question_id) pairs as "recipient:id,id,..." payloads."""
+    by_recipient: Dict[str, List[str]] = {}
+    for recipient_id, question_id in questions:
+        by_recipient.setdefault(str(recipient_id), []).append(str(question_id))
+    return [
+        f"{recipient_id}:{','.join(ids[i:i + _IDS_PER_PAYLOAD])}"
+        for recipient_id, ids in by_recipient.items()
+        for i in range(0, len(ids), _IDS_PER_PAYLOAD)
+    ]
+
+
+def _dispatch_payload(payload: str) -> None:
+    recipient_id, _, ids = payload.partition(":")
+    broadcaster.dispatch(recipient_id, ids.split(","))
+
+
+def notify_statement(payloads: List[str]):
+    """One pg_notify() per payload, in a single statement."""
+    return select(func.pg_notify(CHANNEL, func.unnest(literal(payloads, ARRAY(Text)))))
+
+
+async def notify_new_questions_async(
+    db: AsyncSession, questions: Iterable[Tuple[UUID, UUID]]
+) -> None:
+    """
+    Tell the recipients' streams about new questions, given as
+    (recipient_id, question_id) pairs, once `db`'s transaction commits.
+    """
+    payloads = _payloads(questions)
+    if not payloads:
+        return
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(notify_statement(payloads))
+    else:
+        db.info.setdefault("question_notifications", []).extend(payloads)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session) -> None:
+    for payload in session.info.pop("question_notifications", ()):
+        _dispatch_payload(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_rollback(session: Session) -> None:
+    session.info.pop("question_notifications", None)
+
+
+def listen_url() -> str:
+    """A plain postgresql:// URL for asyncpg, from STREAM_LISTEN_URL or the database's."""
+    url = settings.STREAM_LISTEN_URL or settings.SQLALCHEMY_DATABASE_URI
+    scheme, _, rest = url.partition("://")
+    return "postgresql://" + rest if scheme.startswith("postgres") else url
+
+
+class QuestionListener:
+    """
+    LISTENs on CHANNEL over a dedicated connection and feeds the broadcaster,
+    reconnecting with backoff if the connection drops. Notifications sent
+    while it's down are lost, so every reconnect also ends this process's
+    streams, whose clients then replay from their Last-Event-ID.
+    """
+
+    def __init__(self, url: str, *, ping_seconds: float = 30.0) -> None:
+        self.url = url
+        self.ping_seconds = ping_seconds
+        self._delay = 1.0  # before the next reconnect; reset once listening
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        _dispatch_payload(payload)
+
+    async def _listen(self) -> None:
+        import asyncpg  # the asyncio Postgres driver, only needed here
+
+        ssl = "require" if settings.ENVIRONMENT == "production" else None
+        connection = await asyncpg.connect(self.url, ssl=ssl)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(CHANNEL, self._on_notification)
+            broadcaster.close_all()
+            self._delay = 1.0
+            logger.info("Listening for new questions")
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), timeout=self.ping_seconds)
+                except asyncio.TimeoutError:
+                    # An idle socket can die silently; a query notices
+                    await connection.fetchval("SELECT 1", timeout=self.ping_seconds)
+        finally:
+            await connection.close(timeout=5)
+
+    async def _serve(self) -> None:
+        while True:
+            try:
+                await self._listen()
+                logger.warning("Question listener connection lost, reconnecting in %.0fs", self._delay)
+            except Exception:
+                logger.exception("Question listener failed, reconnecting in %.0fs", self._delay)
+            await asyncio.sleep(self._delay)
+            self._delay = min(self._delay * 2, 60.0)
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._serve())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_listener: Optional[QuestionListener] = None
+
+
+def start_question_listener() -> None:
+    """On Postgres, start this process's listener (app startup)."""
+    global _listener
+    url = listen_url()
+    if url.startswith("postgresql://"):
+        _listener = QuestionListener(url)
+        _listener.start()
+
+
+async def stop_question_listener() -> None:
+    """Stop listening and end this process's streams (app shutdown)."""
+    global _listener
+    if _listener is not None:
+        await _listener.stop()
+        _listener = None
+    broadcaster.close_all()
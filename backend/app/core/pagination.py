@@ -0,0 +1,52 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, NamedTuple
+
+# Most items one list endpoint returns per request
+MAX_PAGE_SIZE = 500
+
+
+class Cursor(NamedTuple):
+    """Keyset position: the last (created_at, id) a client has seen."""
+    created_at: datetime
+    id: str
+
+
+def encode_cursor(created_at: datetime, id: Any) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Parse a cursor from encode_cursor; raises ValueError for anything else."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        # Keys are UUIDs; anything else would fail later, as a bind error
+        return Cursor(datetime.fromisoformat(created_at), str(uuid.UUID(str(id))))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class SearchCursor(NamedTuple):
+    """Position in ranked search results: best rank first, then newest."""
+    rank: float
+    created_at: datetime
+    id: str
+
+
+def encode_search_cursor(rank: float, created_at: datetime, id: Any) -> str:
+    raw = json.dumps([rank, created_at.isoformat(), str(id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> SearchCursor:
+    """Parse a cursor from encode_search_cursor; raises ValueError for anything else."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return SearchCursor(float(rank), datetime.fromisoformat(created_at), str(uuid.UUID(str(id))))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
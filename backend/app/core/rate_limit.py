@@ -0,0 +1,147 @@
+"""
+Token-bucket rate limits for the expensive endpoints.
+
+Each limit is a bucket of `capacity` tokens refilled evenly over `period`
+seconds; a request takes one token, and when the bucket is empty it gets
+a 429 with Retry-After set to when the next token arrives. Buckets live
+in a store:
+
+    MemoryRateLimitStore  per process (the default). With several workers
+                          a client can get up to WEB_CONCURRENCY times the
+                          limit, which still bounds the CPU it can burn.
+    RedisRateLimitStore   shared by every worker, when RATE_LIMIT_STORE_URL
+                          is set; needs the optional `redis` package.
+
+Routes opt in with the deps.limit_by_ip / deps.limit_by_user dependencies.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+class RateLimit:
+    __slots__ = ("capacity", "period")
+
+    def __init__(self, capacity: int, period: float) -> None:
+        self.capacity = capacity
+        self.period = period
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return self.capacity / self.period
+
+    def __repr__(self) -> str:
+        return f"RateLimit({self.capacity}/{self.period:g}s)"
+
+
+def parse_rate_limits(spec: str) -> Dict[str, RateLimit]:
+    """Parse "auth.token=10/60,auth.register=5/3600" into {name: RateLimit}."""
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            capacity, period = value.split("/", 1)
+            limits[name.strip()] = RateLimit(int(capacity), float(period))
+    return limits
+
+
+def retry_after(wait: float) -> str:
+    """Retry-After takes whole seconds; round up so a retry isn't early."""
+    return str(max(1, math.ceil(wait)))
+
+
+class MemoryRateLimitStore:
+    """
+    Buckets in this process's memory, least recently used dropped beyond
+    `max_keys`. A dropped bucket comes back full, which only errs lenient.
+    """
+
+    def __init__(self, max_keys: int = 10000) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        """Take a token; returns 0 if granted, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated_at) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# Same algorithm as MemoryRateLimitStore.take, atomic inside Redis and on
+# Redis' clock, so workers on different hosts agree. Floats go back as a
+# string: Lua numbers returned to Redis are truncated to integers.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitStore:
+    """
+    Buckets in Redis, shared by every worker and host. `client` is an
+    already-made redis.asyncio client to use instead of connecting to `url`.
+    """
+
+    def __init__(self, url: str = "", prefix: str = "ratelimit:", client=None) -> None:
+        if client is None:
+            import redis.asyncio as redis  # optional dependency
+
+            client = redis.from_url(url)
+        self.prefix = prefix
+        self._redis = client
+        self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        wait = await self._script(keys=[self.prefix + key], args=[limit.capacity, limit.rate])
+        return float(wait)
+
+
+rate_limits = parse_rate_limits(settings.RATE_LIMITS)
+
+_store: Optional[object] = None
+
+
+def get_rate_limit_store():
+    """The process's store; a dependency, so tests can swap in their own."""
+    global _store
+    if _store is None:
+        if settings.RATE_LIMIT_STORE_URL:
+            _store = RedisRateLimitStore(settings.RATE_LIMIT_STORE_URL)
+        else:
+            _store = MemoryRateLimitStore()
+    return _store
@@ -0,0 +1,66 @@
+"""
+Fast path for large listings: rows straight to JSON.
+
+Returning ORM objects makes FastAPI validate every row into the
+response_model (nested Question and UserBase models included) and then
+encode the result, which dominates a long listing. Endpoints on this path
+select just the serialized columns, shape the rows with shape_rows and
+return projected_response, which orjson renders directly.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+
+def shape_rows(keys: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Nest flat rows by their column labels: "question__author__email" ends
+    up at item["question"]["author"]["email"]. A nested object whose id is
+    NULL came from an outer join that found nothing, and becomes None.
+    """
+    paths = [tuple(key.split("__")) for key in keys]
+    # Deepest first, so an object is checked before its parent
+    nested = sorted({path[:i] for path in paths for i in range(1, len(path))}, key=len, reverse=True)
+    items = []
+    for row in rows:
+        item: Dict[str, Any] = {}
+        for path, value in zip(paths, row):
+            target = item
+            for part in path[:-1]:
+                target = target.setdefault(part, {})
+            target[path[-1]] = value
+        for path in nested:
+            parent = item
+            for part in path[:-1]:
+                parent = parent[part]
+            if parent[path[-1]].get("id", True) is None:
+                parent[path[-1]] = None
+        items.append(item)
+    return items
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def projected_response(
+    content: Any, *, schema: Any, response: Optional[Response] = None
+) -> ORJSONResponse:
+    """
+    Render `content` with orjson, bypassing response_model validation.
+
+    Outside production `content` is still checked against `schema` (the
+    route's response_model), so a projection that drifts from the schema
+    fails in tests rather than in clients. Headers already set on the
+    endpoint's injected `response` (ETag, Cache-Control) are carried over.
+    """
+    if settings.ENVIRONMENT != "production":
+        _adapter(schema).validate_python(content)
+    headers = dict(response.headers) if response is not None else None
+    return ORJSONResponse(content, headers=headers)
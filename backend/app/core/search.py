@@ -0,0 +1,81 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+# Close to what Postgres' `english` configuration drops
+STOP_WORDS = frozenset("""
+    a about above after again against all am an and any are as at be because
+    been before being below between both but by can could did do does doing
+    down during each few for from further had has have having he her here hers
+    herself him himself his how i if in into is it its itself just me more most
+    my myself no nor not now of off on once only or other our ours ourselves
+    out over own same she should so some such than that the their theirs them
+    themselves then there these they this those through to too under until up
+    very was we were what when where which while who whom why will with would
+    you your yours yourself yourselves
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping, enough that "cats" finds "cat" as it does in Postgres."""
+    for suffix, replacement in (("ies", "y"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            return word[:-len(suffix)] + replacement
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed terms of `text`, stop words dropped."""
+    return [
+        _stem(word)
+        for word in _WORD.findall((text or "").lower().replace("'", ""))
+        if word not in STOP_WORDS
+    ]
+
+
+class InvertedIndex:
+    """
+    In-memory term -> document postings, the fallback for databases
+    without full-text search (SQLite in tests and local development).
+
+    Queries behave like Postgres' plainto_tsquery: every term must match.
+    Scores are summed tf-idf, so they rank like ts_rank without matching
+    its values.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self._documents = 0
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        self._documents += 1
+        for term, count in Counter(tokenize(text)).items():
+            self._postings[term][doc_id] = count
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[Hashable, str]]) -> "InvertedIndex":
+        index = cls()
+        for doc_id, text in documents:
+            index.add(doc_id, text)
+        return index
+
+    def search(self, query: str) -> Dict[Hashable, float]:
+        """Score of every document containing all of the query's terms."""
+        terms = set(tokenize(query))
+        if not terms:
+            return {}
+        postings = [self._postings.get(term, {}) for term in terms]
+        # Intersect starting from the rarest term
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for docs in postings[1:]:
+            matches &= docs.keys()
+        scores: Dict[Hashable, float] = {}
+        for doc_id in matches:
+            scores[doc_id] = sum(
+                docs[doc_id] * math.log(1 + self._documents / len(docs)) for docs in postings
+            )
+        return scores
@@ -1,10 +1,26 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple
+from jose import jwt
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+@lru_cache()
+def _crypt_context(rounds: int) -> "CryptContext":
+    # Imported on first use: the async paths hash in the pool's worker
+    # processes, so API workers only load passlib for the sync helpers
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
@@ -17,14 +33,84 @@ def create_access_token(subject: str, expires_delta: Optional[timedelta] = None)
     return encoded_jwt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    print(f"Verifying password. Hash length: {len(hashed_password)}")
     try:
-        result = pwd_context.verify(plain_password, hashed_password)
-        print(f"Password verification result: {result}")
-        return result
-    except Exception as e:
-        print(f"Password verification error: {str(e)}")
+        return _crypt_context(settings.BCRYPT_ROUNDS).verify(plain_password, hashed_password)
+    except Exception:
+        logger.warning("Password verification error", exc_info=True)
         return False
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _crypt_context(settings.BCRYPT_ROUNDS).hash(password)
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify jobs are already queued."""
+
+# bcrypt is deliberately slow and CPU-bound, so the async paths run it in a
+# small process pool instead of on the event loop or the request threadpool.
+# At most PASSWORD_HASH_MAX_PENDING jobs may be queued or running; beyond
+# that callers are turned away rather than piling up behind the pool.
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None  # the loop's default thread pool
+    with _executor_lock:
+        if _executor is None:
+            # spawn rather than fork: the parent runs logging and pool threads
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+def shutdown_password_hasher() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+async def _run_hasher(fn: Callable[..., Any], *args: Any) -> Any:
+    global _pending
+    with _executor_lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise PasswordHasherBusy()
+        _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        with _executor_lock:
+            _pending -= 1
+
+# Worker-side functions take the cost factor explicitly, since spawned
+# processes don't see settings changed at runtime in the parent.
+
+def _hash_in_worker(password: str, rounds: int) -> str:
+    return _crypt_context(rounds).hash(password)
+
+def _verify_and_update_in_worker(
+    plain_password: str, hashed_password: str, rounds: int
+) -> Tuple[bool, Optional[str]]:
+    try:
+        return _crypt_context(rounds).verify_and_update(plain_password, hashed_password)
+    except Exception:
+        return False, None
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hasher(_hash_in_worker, password, settings.BCRYPT_ROUNDS)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify off the event loop. Also returns a replacement hash when the
+    stored one was made with a different cost (or is otherwise outdated), so the
+    caller can upgrade it transparently.
+    """
+    return await _run_hasher(
+        _verify_and_update_in_worker, plain_password, hashed_password, settings.BCRYPT_ROUNDS
+    )
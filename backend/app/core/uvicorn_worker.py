@@ -0,0 +1,21 @@
+"""
+The gunicorn worker class (gunicorn.conf.py): uvicorn's, with a bound on
+graceful shutdown.
+
+Uvicorn waits for open requests before running the app's shutdown
+handlers, and an event stream never finishes by itself. Past
+GRACEFUL_SHUTDOWN_SECONDS it cancels what's left (streams' clients just
+reconnect to another worker) and shuts down cleanly, rather than being
+killed at gunicorn's graceful_timeout with the shutdown handlers unrun.
+"""
+from uvicorn.workers import UvicornWorker as _UvicornWorker
+
+# Below gunicorn's graceful_timeout (30s), so the shutdown handlers get to run
+GRACEFUL_SHUTDOWN_SECONDS = 10
+
+
+class UvicornWorker(_UvicornWorker):
+    CONFIG_KWARGS = {
+        **_UvicornWorker.CONFIG_KWARGS,
+        "timeout_graceful_shutdown": GRACEFUL_SHUTDOWN_SECONDS,
+    }
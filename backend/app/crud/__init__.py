@@ -1,5 +1,7 @@
 from .crud_user import user
 from .crud_question import question
 from .crud_answer import answer
+from .crud_user_stats import user_stats
+from .crud_daily_assignment import daily_assignment
 
-__all__ = ["user", "question", "answer"]
+__all__ = ["user", "question", "answer", "user_stats", "daily_assignment"]
@@ -1,7 +1,13 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import Select, and_, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.pagination import Cursor, SearchCursor, encode_cursor, encode_search_cursor
+from app.core.responses import shape_rows
+from app.core.search import InvertedIndex
+from app.db.search import SEARCH_CONFIG
 from app.db.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -26,6 +32,63 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def _page_query(
+        self,
+        *,
+        after: Optional[Cursor],
+        limit: int,
+        where: Sequence[Any] = (),
+        options: Sequence[Any] = (),
+        base: Optional[Select] = None
+    ):
+        """
+        Newest-first keyset page on (created_at, id).
+
+        Seeks past `after` instead of using OFFSET, so a deep page reads the
+        same number of index entries as the first one. One extra row is
+        fetched to tell whether another page follows. `base` replaces the
+        plain SELECT of the model, e.g. with a column projection.
+        """
+        stmt = (select(self.model) if base is None else base).where(*where).options(*options)
+        if after is not None:
+            stmt = stmt.where(
+                self.model.created_at <= after.created_at,
+                or_(
+                    self.model.created_at < after.created_at,
+                    and_(
+                        self.model.created_at == after.created_at,
+                        self.model.id < after.id
+                    )
+                )
+            )
+        return stmt\
+            .order_by(self.model.created_at.desc(), self.model.id.desc())\
+            .limit(limit + 1)
+
+    def _page_result(
+        self, rows: Sequence[ModelType], limit: int
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        rows = list(rows)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        if not rows:
+            return [], None
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        where: Sequence[Any] = (),
+        options: Sequence[Any] = ()
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """Returns one page of rows and the cursor for the next page, if any."""
+        stmt = self._page_query(after=after, limit=limit, where=where, options=options)
+        return self._page_result(db.execute(stmt).scalars().all(), limit)
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
@@ -59,3 +122,182 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.delete(obj)
         db.commit()
         return obj
+
+    # Async variants for handlers running on the event loop. Relationships
+    # can't be lazy-loaded through an AsyncSession, so callers that serialize
+    # nested objects pass the loader `options` they need.
+
+    async def get_async(
+        self, db: AsyncSession, id: Any, *, options: Sequence[Any] = ()
+    ) -> Optional[ModelType]:
+        stmt = select(self.model).where(self.model.id == id)
+        if options:
+            stmt = stmt.options(*options).execution_options(populate_existing=True)
+        result = await db.execute(stmt)
+        return result.scalars().first()
+
+    async def get_multi_async(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        options: Sequence[Any] = ()
+    ) -> List[ModelType]:
+        stmt = select(self.model).options(*options).offset(skip).limit(limit)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        *,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        where: Sequence[Any] = (),
+        options: Sequence[Any] = ()
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        stmt = self._page_query(after=after, limit=limit, where=where, options=options)
+        result = await db.execute(stmt)
+        return self._page_result(result.scalars().all(), limit)
+
+    async def get_rows_page_async(
+        self,
+        db: AsyncSession,
+        *,
+        columns: Select,
+        after: Optional[Cursor] = None,
+        limit: int = 100,
+        where: Sequence[Any] = ()
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        get_page_async for a column projection: a keyset page of `columns`
+        (which must include the model's id and created_at), shaped into
+        dicts by shape_rows.
+        """
+        stmt = self._page_query(after=after, limit=limit, where=where, base=columns)
+        result = await db.execute(stmt)
+        rows, next_cursor = self._page_result(result.all(), limit)
+        return shape_rows(list(result.keys()), rows), next_cursor
+
+    async def search_page_async(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        after: Optional[SearchCursor] = None,
+        limit: int = 20,
+        where: Sequence[Any] = (),
+        options: Sequence[Any] = ()
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Ranked keyset page of rows whose text matches `query`, best match
+        first, for models set up with app.db.search.add_search_vector.
+
+        On Postgres this is a GIN lookup on search_vector ranked by ts_rank.
+        Elsewhere the rows allowed by `where` are indexed in memory; that
+        reads every candidate, so it's only meant for SQLite test runs.
+        """
+        if db.bind.dialect.name == "postgresql":
+            ranked = await self._search_postgres_async(
+                db, query=query, after=after, limit=limit, where=where, options=options
+            )
+        else:
+            ranked = await self._search_fallback_async(
+                db, query=query, after=after, limit=limit, where=where, options=options
+            )
+        if len(ranked) <= limit:
+            return [row for row, _ in ranked], None
+        ranked = ranked[:limit]
+        last, rank = ranked[-1]
+        return [row for row, _ in ranked], encode_search_cursor(rank, last.created_at, last.id)
+
+    def _search_statement(
+        self, *, query: str, after: Optional[SearchCursor], limit: int,
+        where: Sequence[Any] = (), options: Sequence[Any] = ()
+    ):
+        vector = self.model.__table__.c.search_vector
+        tsquery = func.plainto_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(vector, tsquery)
+        stmt = select(self.model, rank.label("rank"))\
+            .where(vector.bool_op("@@")(tsquery), *where)\
+            .options(*options)
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(rank, self.model.created_at, self.model.id)
+                < tuple_(after.rank, after.created_at, after.id)
+            )
+        return stmt\
+            .order_by(rank.desc(), self.model.created_at.desc(), self.model.id.desc())\
+            .limit(limit + 1)
+
+    async def _search_postgres_async(
+        self, db: AsyncSession, *, query: str, after: Optional[SearchCursor], limit: int,
+        where: Sequence[Any], options: Sequence[Any]
+    ) -> List[Tuple[ModelType, float]]:
+        stmt = self._search_statement(
+            query=query, after=after, limit=limit, where=where, options=options
+        )
+        result = await db.execute(stmt)
+        return [(row, rank) for row, rank in result.all()]
+
+    async def _search_fallback_async(
+        self, db: AsyncSession, *, query: str, after: Optional[SearchCursor], limit: int,
+        where: Sequence[Any], options: Sequence[Any]
+    ) -> List[Tuple[ModelType, float]]:
+        candidates = (await db.execute(
+            select(self.model.id, self.model.text, self.model.created_at).where(*where)
+        )).all()
+        scores = InvertedIndex.build((id, text) for id, text, _ in candidates).search(query)
+        created = {id: created_at for id, _, created_at in candidates}
+        # Ids are compared in their text form, as cursors carry them
+        keys = sorted(
+            ((scores[id], created[id], str(id)) for id in scores),
+            reverse=True,
+        )
+        if after is not None:
+            keys = [key for key in keys if key < tuple(after)]
+        keys = keys[:limit + 1]
+        if not keys:
+            return []
+        result = await db.execute(
+            select(self.model).where(self.model.id.in_([id for _, _, id in keys])).options(*options)
+        )
+        rows = {str(row.id): row for row in result.scalars().all()}
+        return [(rows[id], rank) for rank, _, id in keys if id in rows]
+
+    async def create_async(
+        self, db: AsyncSession, *, obj_in: CreateSchemaType
+    ) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)  # type: ignore
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update_async(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for column in self.model.__table__.columns:
+            if column.key in update_data:
+                setattr(db_obj, column.key, update_data[column.key])
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove_async(self, db: AsyncSession, *, id: Any) -> Optional[ModelType]:
+        obj = await db.get(self.model, id)
+        if obj is not None:
+            await db.delete(obj)
+            await db.commit()
+        return obj
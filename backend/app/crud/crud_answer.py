@@ -1,32 +1,233 @@
-from typing import List, Optional
-from datetime import date, datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import date, datetime, time, timedelta
+from uuid import UUID, uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import Select, exists, false, insert, select, update
+from app.core.pagination import Cursor, SearchCursor
+from app.core.responses import shape_rows
 from app.crud.base import CRUDBase
+from app.crud.crud_question import question_columns
 from app.models.answer import Answer
+from app.models.question import Question
+from app.models.user import User
 from app.schemas.answer import AnswerCreate, AnswerUpdate
 
 
 class CRUDAnswer(CRUDBase[Answer, AnswerCreate, AnswerUpdate]):
-    def get_by_question_and_user(
-        self, db: Session, *, question_id: str, user_id: str
+    # Loader options for serializing an Answer with its question and the
+    # question's author. Both hops are many-to-one, so they're joined into
+    # the same SELECT and a listing costs one query however many rows it has.
+    with_question = (joinedload(Answer.question).joinedload(Question.author),)
+
+    def _rows_select(self) -> Select:
+        """
+        Projection for the listing fast path (app.core.responses): the
+        Answer schema's columns, then its question's and author's.
+        """
+        return select(
+            Answer.text,
+            Answer.id,
+            Answer.question_id,
+            Answer.user_id,
+            Answer.created_at,
+            Answer.updated_at,
+            *question_columns("question__"),
+        )\
+            .join(Question, Question.id == Answer.question_id)\
+            .outerjoin(User, User.id == Question.author_id)
+
+    def _created_on(self, day: date) -> tuple:
+        """
+        Half-open range on created_at covering `day`.
+
+        Comparing the bare column (rather than func.date(created_at)) lets the
+        planner use ix_answers_user_id_created_at. Nothing in the app filters
+        answers by creation day any more (daily answers go by answered_on);
+        it's kept for tests/test_indexes.py, which checks that plan.
+        """
+        start = datetime.combine(day, time.min)
+        return (
+            self.model.created_at >= start,
+            self.model.created_at < start + timedelta(days=1),
+        )
+
+    def answered_daily_on(self, user_id: Any, day: date):
+        """
+        EXISTS clause: `user_id` submitted their daily answer on `day`.
+
+        Only daily answers set answered_on, so answers posted directly to
+        /answers/ don't count; uq_answers_user_id_answered_on serves it.
+        """
+        return exists().where(
+            self.model.user_id == user_id,
+            self.model.answered_on == day,
+        )
+
+    async def has_daily_answer_async(
+        self, db: AsyncSession, *, user_id: UUID, day: date
+    ) -> bool:
+        return bool(await db.scalar(select(self.answered_daily_on(user_id, day))))
+
+    async def get_with_question_async(
+        self, db: AsyncSession, *, id: UUID
     ) -> Optional[Answer]:
-        """Get an answer for a specific question from a specific user."""
-        return db.query(self.model)\
-            .filter(
-                self.model.question_id == question_id,
-                self.model.user_id == user_id
-            ).first()
-
-    def get_by_user_and_date(
-        self, db: Session, *, user_id: str, date: date
+        """Get an answer with its question and the question's author loaded."""
+        return await self.get_async(db, id, options=self.with_question)
+
+    async def get_multi_by_user_async(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        options: Sequence[Any] = with_question
+    ) -> List[Answer]:
+        """A user's answers, newest first, with questions and authors loaded."""
+        stmt = select(self.model)\
+            .where(self.model.user_id == user_id)\
+            .options(*options)\
+            .order_by(self.model.created_at.desc(), self.model.id.desc())\
+            .offset(skip)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_multi_rows_by_user_async(
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """get_multi_by_user_async as plain dicts, no ORM objects."""
+        result = await db.execute(
+            self._rows_select()
+            .where(self.model.user_id == user_id)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return shape_rows(list(result.keys()), result.all())
+
+    async def get_rows_page_by_user_async(
+        self, db: AsyncSession, *, user_id: UUID, after: Optional[Cursor] = None, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Keyset page of a user's answers, newest first, as plain dicts."""
+        return await self.get_rows_page_async(
+            db,
+            columns=self._rows_select(),
+            after=after,
+            limit=limit,
+            where=[self.model.user_id == user_id],
+        )
+
+    async def search_by_user_async(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        query: str,
+        after: Optional[SearchCursor] = None,
+        limit: int = 20,
+        options: Sequence[Any] = with_question
+    ) -> Tuple[List[Answer], Optional[str]]:
+        """Ranked page of a user's answers matching `query`."""
+        return await self.search_page_async(
+            db,
+            query=query,
+            after=after,
+            limit=limit,
+            where=[self.model.user_id == user_id],
+            options=options,
+        )
+
+    async def stream_by_user_async(
+        self, db: AsyncSession, *, user_id: UUID, batch_size: int = 500
+    ) -> AsyncIterator[List[Answer]]:
+        """
+        A user's answers, oldest first, with questions and authors loaded,
+        in batches of `batch_size` read from a server-side cursor.
+
+        The identity map only holds weak references, so rows from batches
+        the caller has finished with are freed and memory stays flat.
+        """
+        result = await db.stream(
+            select(self.model)
+            .where(self.model.user_id == user_id)
+            .options(*self.with_question)
+            .order_by(self.model.created_at, self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for batch in result.scalars().partitions():
+            yield batch
+
+    def _claim_statement(self, db: AsyncSession, question_id: UUID, user_id: UUID):
+        """
+        Conditional UPDATE that marks the question answered. On Postgres it
+        runs as a CTE joined to the author, so both come back in one
+        statement; elsewhere it returns just the question.
+        """
+        claimable = (
+            Question.id == question_id,
+            Question.recipient_id == user_id,
+            Question.is_answered == false(),
+        )
+        if db.bind.dialect.name == "postgresql":
+            claimed = update(Question.__table__)\
+                .where(*claimable)\
+                .values(is_answered=True)\
+                .returning(*Question.__mapper__.columns)\
+                .cte("claimed")
+            claimed_question = aliased(Question, claimed)
+            return select(claimed_question, User)\
+                .outerjoin(User, User.id == claimed_question.author_id)
+        return update(Question)\
+            .where(*claimable)\
+            .values(is_answered=True)\
+            .returning(Question)\
+            .execution_options(synchronize_session=False)
+
+    async def answer_daily_async(
+        self, db: AsyncSession, *, question_id: UUID, user_id: UUID, text: str
     ) -> Optional[Answer]:
-        """Get all answers from a user on a specific date."""
-        return db.query(self.model)\
-            .filter(
-                self.model.user_id == user_id,
-                func.date(self.model.created_at) == date
-            ).first()
+        """
+        Claim the question and insert the answer, without committing.
+
+        The conditional UPDATE only matches an unanswered question addressed
+        to `user_id`, so a concurrent submit for the same question gets None.
+        A second daily answer on the same day violates
+        uq_answers_user_id_answered_on and raises IntegrityError. Either way
+        the database enforces the rules; the caller commits or rolls back.
+        """
+        claimed = await db.execute(self._claim_statement(db, question_id, user_id))
+        row = claimed.first()
+        if row is None:
+            return None
+        if len(row) == 2:
+            question, author = row
+        else:
+            # SQLite's RETURNING can't reach a joined table, so there the
+            # author is a separate primary-key read
+            question = row[0]
+            author = await db.get(User, question.author_id) if question.author_id else None
+        set_committed_value(question, "author", author)
+
+        now = datetime.utcnow()
+        db_obj = await db.scalar(
+            insert(Answer)
+            .values(
+                id=uuid4(),
+                question_id=question_id,
+                user_id=user_id,
+                text=text,
+                answered_on=now.date(),
+                created_at=now,
+                updated_at=now,
+            )
+            .returning(Answer)
+        )
+        set_committed_value(db_obj, "question", question)
+        return db_obj
 
 
 answer = CRUDAnswer(Answer)
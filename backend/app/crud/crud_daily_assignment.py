@@ -0,0 +1,82 @@
+from datetime import date
+from typing import Optional, Tuple, Union
+from uuid import UUID
+from pydantic import BaseModel
+from sqlalchemy import Date, false, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from app.crud.base import CRUDBase
+from app.crud.crud_answer import answer as crud_answer
+from app.models.daily_assignment import DailyAssignment
+from app.models.question import Question
+
+
+class CRUDDailyAssignment(CRUDBase[DailyAssignment, BaseModel, BaseModel]):
+    """
+    Each user's daily question, picked once per day.
+
+    assign_all() is meant to run from the scheduled job shortly after UTC
+    midnight; assign_user_async() covers users whose questions arrived after
+    the job ran. Both pick the oldest unanswered question (ties broken by id)
+    and skip users who have already submitted that day's daily answer.
+    """
+
+    with_question = (joinedload(DailyAssignment.question).joinedload(Question.author),)
+
+    def _assign_statement(
+        self, db: Union[Session, AsyncSession], day: date, user_id: Optional[UUID] = None
+    ):
+        ranked = select(
+            Question.recipient_id.label("user_id"),
+            Question.id.label("question_id"),
+            func.row_number().over(
+                partition_by=Question.recipient_id,
+                order_by=(Question.created_at, Question.id),
+            ).label("rank"),
+        ).where(Question.is_answered == false(), Question.recipient_id.is_not(None))
+        if user_id is not None:
+            ranked = ranked.where(Question.recipient_id == user_id)
+        ranked = ranked.subquery()
+
+        answered_today = crud_answer.answered_daily_on(ranked.c.user_id, day)
+        picks = select(
+            ranked.c.user_id, literal(day, Date), ranked.c.question_id
+        ).where(ranked.c.rank == 1, ~answered_today)
+
+        insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        return insert(DailyAssignment)\
+            .from_select(["user_id", "date", "question_id"], picks)\
+            .on_conflict_do_nothing(index_elements=["user_id", "date"])
+
+    def assign_all(self, db: Session, *, day: date) -> int:
+        """Write the day's assignment for every user who needs one."""
+        result = db.execute(self._assign_statement(db, day))
+        db.commit()
+        return result.rowcount
+
+    async def assign_user_async(self, db: AsyncSession, *, user_id: UUID, day: date) -> None:
+        await db.execute(self._assign_statement(db, day, user_id=user_id))
+        await db.commit()
+
+    async def get_for_user_async(
+        self, db: AsyncSession, *, user_id: UUID, day: date
+    ) -> Optional[Tuple[DailyAssignment, bool]]:
+        """
+        Primary-key read of the assignment with its question and author,
+        plus whether the user has already submitted that day's daily answer
+        (possibly to another question), in the same statement.
+        """
+        result = await db.execute(
+            select(
+                DailyAssignment,
+                crud_answer.answered_daily_on(user_id, day).label("answered"),
+            )
+            .where(DailyAssignment.user_id == user_id, DailyAssignment.date == day)
+            .options(*self.with_question)
+        )
+        row = result.first()
+        return (row[0], row[1]) if row else None
+
+
+daily_assignment = CRUDDailyAssignment(DailyAssignment)
@@ -1,14 +1,48 @@
-from typing import List, Optional
-from datetime import date, datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date, datetime, time, timedelta
+from uuid import UUID, uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import Select, and_, insert, or_, select
+from app.core.notifications import notify_new_questions_async
+from app.core.pagination import Cursor, SearchCursor
+from app.core.responses import shape_rows
 from app.crud.base import CRUDBase
+from app.crud.crud_user_stats import user_stats
 from app.models.question import Question
+from app.models.user import User
 from app.schemas.question import QuestionCreate, QuestionUpdate
 
+def question_columns(prefix: str = "") -> Tuple[Any, ...]:
+    """
+    The columns the Question schema serializes, its author's included,
+    labelled for shape_rows. Select from question_author_join(), or join
+    its author the same way.
+    """
+    return (
+        Question.text.label(f"{prefix}text"),
+        Question.id.label(f"{prefix}id"),
+        Question.author_id.label(f"{prefix}author_id"),
+        Question.recipient_id.label(f"{prefix}recipient_id"),
+        Question.is_daily_question.label(f"{prefix}is_daily_question"),
+        Question.created_at.label(f"{prefix}created_at"),
+        User.id.label(f"{prefix}author__id"),
+        User.email.label(f"{prefix}author__email"),
+        User.full_name.label(f"{prefix}author__full_name"),
+    )
+
 class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
+    # Loader options for serializing a Question with its author. author is
+    # many-to-one, so it's joined into the same SELECT instead of lazy-loaded
+    # per row.
+    with_author = (joinedload(Question.author),)
+
+    def _rows_select(self) -> Select:
+        """Projection for the listing fast path (app.core.responses)."""
+        return select(*question_columns()).outerjoin(User, User.id == Question.author_id)
+
     def create(self, db: Session, *, obj_in: QuestionCreate) -> Question:
-        print(f"Creating question with data: {obj_in.dict()}")
         db_obj = Question(
             text=obj_in.text,
             author_id=obj_in.author_id,
@@ -17,22 +51,219 @@ class CRUDQuestion(CRUDBase[Question, QuestionCreate, QuestionUpdate]):
             created_at=datetime.utcnow()
         )
         db.add(db_obj)
+        user_stats.record_questions(db, pairs=[(db_obj.author_id, db_obj.recipient_id)])
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    async def create_many_async(
+        self, db: AsyncSession, *, author: User, items: Iterable[Tuple[UUID, str]]
+    ) -> List[Question]:
+        """
+        Insert one question from `author` per (recipient_id, text) pair and commit.
+
+        The rows go out as multi-row INSERT ... RETURNING statements (SQLAlchemy
+        batches them under the drivers' bind-parameter limits), so a fan-out
+        of thousands is a handful of round trips rather than one per row.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": uuid4(),
+                "text": text,
+                "author_id": author.id,
+                "recipient_id": recipient_id,
+                "is_daily_question": False,
+                "is_answered": False,
+                "created_at": now,
+            }
+            for recipient_id, text in items
+        ]
+        if not rows:
+            return []
+        result = await db.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            rows,
+        )
+        questions = list(result.all())
+        for question in questions:
+            set_committed_value(question, "author", author)
+        await user_stats.record_questions_async(
+            db, pairs=[(row["author_id"], row["recipient_id"]) for row in rows]
+        )
+        await notify_new_questions_async(db, [(row["recipient_id"], row["id"]) for row in rows])
+        await db.commit()
+        return questions
+
     def get_daily_question(self, db: Session, *, date: date) -> Optional[Question]:
+        start = datetime.combine(date, time.min)
         return db.query(self.model)\
-            .filter(func.date(self.model.created_at) == date)\
+            .filter(
+                self.model.created_at >= start,
+                self.model.created_at < start + timedelta(days=1)
+            )\
             .first()
 
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[Question]:
         return db.query(self.model)\
-            .order_by(self.model.created_at.desc())\
+            .order_by(self.model.created_at.desc(), self.model.id.desc())\
             .offset(skip)\
             .limit(limit)\
             .all()
 
+    async def get_multi_async(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100,
+        options: Sequence[Any] = with_author
+    ) -> List[Question]:
+        result = await db.execute(
+            select(self.model)
+            .options(*options)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_user_received_questions_async(
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100,
+        options: Sequence[Any] = with_author
+    ) -> List[Question]:
+        """Questions sent to a user, newest first."""
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.recipient_id == user_id)
+            .options(*options)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_received_rows_async(
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """get_user_received_questions_async as plain dicts, no ORM objects."""
+        result = await db.execute(
+            self._rows_select()
+            .where(self.model.recipient_id == user_id)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return shape_rows(list(result.keys()), result.all())
+
+    async def get_received_rows_page_async(
+        self, db: AsyncSession, *, user_id: UUID, after: Optional[Cursor] = None, limit: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """get_received_page_async as plain dicts, no ORM objects."""
+        return await self.get_rows_page_async(
+            db,
+            columns=self._rows_select(),
+            after=after,
+            limit=limit,
+            where=[self.model.recipient_id == user_id],
+        )
+
+    async def get_received_rows_by_ids_async(
+        self, db: AsyncSession, *, user_id: UUID, ids: Sequence[Any]
+    ) -> List[Dict[str, Any]]:
+        """Those of `ids` sent to the user, as plain dicts, oldest first."""
+        result = await db.execute(
+            self._rows_select()
+            .where(self.model.recipient_id == user_id, self.model.id.in_(ids))
+            .order_by(self.model.created_at, self.model.id)
+        )
+        return shape_rows(list(result.keys()), result.all())
+
+    async def get_received_rows_since_async(
+        self, db: AsyncSession, *, user_id: UUID, after: Cursor, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Questions sent to the user after the `after` position, as plain
+        dicts, oldest first: what a reconnecting stream missed.
+        """
+        result = await db.execute(
+            self._rows_select()
+            .where(
+                self.model.recipient_id == user_id,
+                self.model.created_at >= after.created_at,
+                or_(
+                    self.model.created_at > after.created_at,
+                    and_(self.model.created_at == after.created_at, self.model.id > after.id)
+                )
+            )
+            .order_by(self.model.created_at, self.model.id)
+            .limit(limit)
+        )
+        return shape_rows(list(result.keys()), result.all())
+
+    async def get_latest_received_cursor_async(
+        self, db: AsyncSession, *, user_id: UUID
+    ) -> Optional[Cursor]:
+        """The position of the newest question sent to the user, if any."""
+        row = (await db.execute(
+            select(self.model.created_at, self.model.id)
+            .where(self.model.recipient_id == user_id)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .limit(1)
+        )).first()
+        return Cursor(row.created_at, str(row.id)) if row else None
+
+    async def get_user_sent_questions_async(
+        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100,
+        options: Sequence[Any] = with_author
+    ) -> List[Question]:
+        """Questions a user has asked, newest first."""
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.author_id == user_id)
+            .options(*options)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_received_page_async(
+        self, db: AsyncSession, *, user_id: UUID, after: Optional[Cursor] = None, limit: int = 100,
+        options: Sequence[Any] = with_author
+    ) -> Tuple[List[Question], Optional[str]]:
+        """Keyset page of questions sent to a user, newest first."""
+        return await self.get_page_async(
+            db,
+            after=after,
+            limit=limit,
+            where=[self.model.recipient_id == user_id],
+            options=options,
+        )
+
+    async def get_sent_page_async(
+        self, db: AsyncSession, *, user_id: UUID, after: Optional[Cursor] = None, limit: int = 100,
+        options: Sequence[Any] = with_author
+    ) -> Tuple[List[Question], Optional[str]]:
+        """Keyset page of questions a user has asked, newest first."""
+        return await self.get_page_async(
+            db,
+            after=after,
+            limit=limit,
+            where=[self.model.author_id == user_id],
+            options=options,
+        )
+
+    async def search_for_user_async(
+        self, db: AsyncSession, *, user_id: UUID, query: str, after: Optional[SearchCursor] = None,
+        limit: int = 20, options: Sequence[Any] = with_author
+    ) -> Tuple[List[Question], Optional[str]]:
+        """Ranked page of questions a user has received or asked matching `query`."""
+        return await self.search_page_async(
+            db,
+            query=query,
+            after=after,
+            limit=limit,
+            where=[or_(self.model.recipient_id == user_id, self.model.author_id == user_id)],
+            options=options,
+        )
+
 question = CRUDQuestion(Question)
@@ -1,14 +1,85 @@
-from typing import Any, Dict, Optional, Union
-from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple, Union
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.cache import user_cache
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password_async,
+    verify_password,
+)
 from app.crud.base import CRUDBase
+from app.models.directory_version import DirectoryVersion
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+logger = logging.getLogger(__name__)
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    # Every write here bumps the "users" directory version in its own
+    # transaction; the user listing's ETag is built from it
+    directory = "users"
+
+    def _bump_directory_statement(self, db: Union[Session, AsyncSession]):
+        insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        now = datetime.utcnow()
+        stmt = insert(DirectoryVersion).values(name=self.directory, version=1, updated_at=now)
+        return stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"version": DirectoryVersion.version + 1, "updated_at": now},
+        )
+
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
+    def get_by_email_cached(self, db: Session, *, email: str) -> Optional[User]:
+        """
+        Like get_by_email, but served from the per-worker user cache when possible.
+
+        The cache holds detached snapshots; a hit is merged into `db` without
+        emitting any SQL so the caller still gets a session-bound instance.
+        """
+        snapshot = user_cache.get(email)
+        if snapshot is not None:
+            return db.merge(snapshot, load=False)
+        user = self.get_by_email(db, email=email)
+        if user is not None:
+            user_cache.set(email, self._snapshot(user))
+        return user
+
+    async def get_by_email_async(self, db: AsyncSession, *, email: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
+    async def get_by_email_cached_async(
+        self, db: AsyncSession, *, email: str
+    ) -> Optional[User]:
+        """Async counterpart of get_by_email_cached."""
+        snapshot = user_cache.get(email)
+        if snapshot is not None:
+            return await db.merge(snapshot, load=False)
+        user = await self.get_by_email_async(db, email=email)
+        if user is not None:
+            user_cache.set(email, self._snapshot(user))
+        return user
+
+    def _snapshot(self, user: User) -> User:
+        snapshot = User(**{
+            column.key: getattr(user, column.key)
+            for column in User.__table__.columns
+        })
+        make_transient_to_detached(snapshot)
+        return snapshot
+
+    def invalidate_cache(self, *emails: Optional[str]) -> None:
+        for email in emails:
+            if email:
+                user_cache.invalidate(email)
+
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         db_obj = User(
             email=obj_in.email,
@@ -17,8 +88,24 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             is_active=True,
         )
         db.add(db_obj)
+        db.execute(self._bump_directory_statement(db))
         db.commit()
         db.refresh(db_obj)
+        self.invalidate_cache(db_obj.email)
+        return db_obj
+
+    async def create_async(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
+        db_obj = User(
+            email=obj_in.email,
+            hashed_password=await get_password_hash_async(obj_in.password),
+            full_name=obj_in.full_name,
+            is_active=True,
+        )
+        db.add(db_obj)
+        await db.execute(self._bump_directory_statement(db))
+        await db.commit()
+        await db.refresh(db_obj)
+        self.invalidate_cache(db_obj.email)
         return db_obj
 
     def update(
@@ -32,18 +119,94 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        old_email = db_obj.email
+        db.execute(self._bump_directory_statement(db))
+        try:
+            return super().update(db, db_obj=db_obj, obj_in=update_data)
+        finally:
+            self.invalidate_cache(old_email, db_obj.email)
+
+    async def update_async(
+        self, db: AsyncSession, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("password"):
+            hashed_password = await get_password_hash_async(update_data["password"])
+            del update_data["password"]
+            update_data["hashed_password"] = hashed_password
+        old_email = db_obj.email
+        await db.execute(self._bump_directory_statement(db))
+        try:
+            return await super().update_async(db, db_obj=db_obj, obj_in=update_data)
+        finally:
+            self.invalidate_cache(old_email, db_obj.email)
+
+    async def get_directory_version_async(
+        self, db: AsyncSession
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        (version, when it last moved) of the user directory: a primary-key
+        read that changes with every signup, profile edit, deactivation or
+        deletion, which is what the user listing's validators need.
+        """
+        row = (await db.execute(
+            select(DirectoryVersion.version, DirectoryVersion.updated_at)
+            .where(DirectoryVersion.name == self.directory)
+        )).first()
+        return (row.version, row.updated_at) if row else (0, None)
+
+    def remove(self, db: Session, *, id: Any) -> User:
+        db_obj = self.get(db, id=id)
+        email = db_obj.email if db_obj else None
+        if db_obj is not None:
+            db.execute(self._bump_directory_statement(db))
+        obj = super().remove(db, id=id)
+        self.invalidate_cache(email)
+        return obj
+
+    async def remove_async(self, db: AsyncSession, *, id: Any) -> Optional[User]:
+        db_obj = await db.get(User, id)
+        if db_obj is None:
+            return None
+        await db.execute(self._bump_directory_statement(db))
+        await db.delete(db_obj)
+        await db.commit()
+        self.invalidate_cache(db_obj.email)
+        return db_obj
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
-        print(f"Login attempt for email: {email}")
-        print(f"User found: {user is not None}")
         if not user:
+            logger.debug("Login failed: unknown email")
             return None
         if not verify_password(password, user.hashed_password):
-            print("Password verification failed")
+            logger.debug("Login failed: bad password for user %s", user.id)
+            return None
+        return user
+
+    async def authenticate_async(
+        self, db: AsyncSession, *, email: str, password: str
+    ) -> Optional[User]:
+        """
+        Verify a login without blocking the event loop, upgrading the stored
+        hash when it was made with an outdated cost factor.
+        """
+        user = await self.get_by_email_async(db, email=email)
+        if not user:
+            logger.debug("Login failed: unknown email")
+            return None
+        valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not valid:
+            logger.debug("Login failed: bad password for user %s", user.id)
             return None
-        print("Authentication successful")
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+            self.invalidate_cache(user.email)
+            logger.info("Rehashed password for user %s", user.id)
         return user
 
     def is_active(self, user: User) -> bool:
@@ -0,0 +1,230 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from uuid import UUID
+from pydantic import BaseModel
+from sqlalchemy import Integer, String, cast, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.jobs.queue import enqueue
+from app.models.user import User
+from app.models.user_stats import QuestionPairCount, UserStats
+
+
+class CRUDUserStats(CRUDBase[UserStats, BaseModel, BaseModel]):
+    """
+    Maintains the user_stats and question_pair_counts counters.
+
+    The record_* and touch methods only execute upserts on the caller's
+    session; they don't commit, so the counters land in the same
+    transaction as the questions or answers they count. The one exception
+    is the per-pair counts of record_questions_async, which it enqueues as
+    a job on that same transaction.
+
+    Every user_stats upsert also bumps `version` and `updated_at`, which
+    back the HTTP validators of the user's own read endpoints.
+    """
+
+    def _upsert(
+        self, db: Union[Session, AsyncSession], table, values: List[Dict[str, Any]],
+        keys: List[str], increments: List[str]
+    ):
+        insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        # Rows are locked in the order given; in key order, transactions
+        # touching the same users (A asks B while B asks A) can't deadlock
+        values = sorted(values, key=lambda row: tuple(str(row[key]) for key in keys))
+        touch = table is UserStats.__table__
+        if touch:
+            now = datetime.utcnow()
+            values = [{**row, "version": 1, "updated_at": now} for row in values]
+        stmt = insert(table).values(values)
+        set_ = {column: table.c[column] + stmt.excluded[column] for column in increments}
+        if touch:
+            set_["version"] = table.c.version + 1
+            set_["updated_at"] = stmt.excluded.updated_at
+        return stmt.on_conflict_do_update(index_elements=keys, set_=set_)
+
+    def _asked_statement(
+        self, db: Union[Session, AsyncSession], pair_counts: Dict[Tuple[UUID, UUID], int]
+    ):
+        # Recipients get a row too, with nothing added, so their version moves
+        asked: Dict[UUID, int] = {}
+        for (author_id, recipient_id), count in pair_counts.items():
+            asked[author_id] = asked.get(author_id, 0) + count
+            asked.setdefault(recipient_id, 0)
+        return self._upsert(
+            db, UserStats.__table__,
+            [
+                {"user_id": user_id, "questions_asked": count, "questions_answered": 0}
+                for user_id, count in asked.items()
+            ],
+            keys=["user_id"], increments=["questions_asked"],
+        )
+
+    def _pair_count_statement(
+        self, db: Union[Session, AsyncSession], pair_counts: Dict[Tuple[UUID, UUID], int]
+    ):
+        return self._upsert(
+            db, QuestionPairCount.__table__,
+            [
+                {"author_id": author_id, "recipient_id": recipient_id, "count": count}
+                for (author_id, recipient_id), count in pair_counts.items()
+            ],
+            keys=["author_id", "recipient_id"], increments=["count"],
+        )
+
+    def _question_statements(
+        self, db: Union[Session, AsyncSession], pairs: Iterable[Tuple[UUID, UUID]]
+    ) -> list:
+        pair_counts = Counter(pairs)
+        if not pair_counts:
+            return []
+        return [
+            self._asked_statement(db, pair_counts),
+            self._pair_count_statement(db, pair_counts),
+        ]
+
+    def _answer_statement(self, db: Union[Session, AsyncSession], user_id: UUID):
+        return self._upsert(
+            db, UserStats.__table__,
+            [{"user_id": user_id, "questions_asked": 0, "questions_answered": 1}],
+            keys=["user_id"], increments=["questions_answered"],
+        )
+
+    def _touch_statement(self, db: Union[Session, AsyncSession], user_ids: Iterable[UUID]):
+        return self._upsert(
+            db, UserStats.__table__,
+            [
+                {"user_id": user_id, "questions_asked": 0, "questions_answered": 0}
+                for user_id in user_ids
+            ],
+            keys=["user_id"], increments=[],
+        )
+
+    def record_questions(self, db: Session, *, pairs: Iterable[Tuple[UUID, UUID]]) -> None:
+        """Count new questions, given as (author_id, recipient_id) pairs."""
+        for stmt in self._question_statements(db, pairs):
+            db.execute(stmt)
+
+    async def record_questions_async(
+        self, db: AsyncSession, *, pairs: Iterable[Tuple[UUID, UUID]]
+    ) -> None:
+        """
+        Count new questions. The totals (and with them the versions behind
+        the ETags) move in the caller's transaction; the per-pair counts for
+        the top-N lists are left to a "questions.sent" job, which is the
+        costly upsert for a large fan-out and isn't needed for the response.
+        """
+        pair_counts = Counter(pairs)
+        if not pair_counts:
+            return
+        await db.execute(self._asked_statement(db, pair_counts))
+        enqueue(
+            db, "questions.sent",
+            pairs=[[str(a), str(r), count] for (a, r), count in pair_counts.items()],
+        )
+
+    async def record_pair_counts_async(
+        self, db: AsyncSession, *, pair_counts: Dict[Tuple[UUID, UUID], int]
+    ) -> None:
+        """
+        Add to the per-pair counts, and bump the version of everyone involved
+        so a cached /users/me/stats picks up the new top-N lists.
+        """
+        if not pair_counts:
+            return
+        await db.execute(self._pair_count_statement(db, pair_counts))
+        await db.execute(self._touch_statement(
+            db, {user_id for pair in pair_counts for user_id in pair}
+        ))
+
+    def record_answer(self, db: Session, *, user_id: UUID) -> None:
+        db.execute(self._answer_statement(db, user_id))
+
+    async def record_answer_async(self, db: AsyncSession, *, user_id: UUID) -> None:
+        await db.execute(self._answer_statement(db, user_id))
+
+    def touch(self, db: Session, *, user_id: UUID) -> None:
+        """Bump the user's version after a write the counters don't see."""
+        db.execute(self._touch_statement(db, [user_id]))
+
+    async def touch_async(self, db: AsyncSession, *, user_id: UUID) -> None:
+        await db.execute(self._touch_statement(db, [user_id]))
+
+    async def get_version_async(
+        self, db: AsyncSession, *, user_id: UUID
+    ) -> Tuple[int, Optional[datetime]]:
+        """The user's (version, updated_at); (0, None) before their first write."""
+        row = (await db.execute(
+            select(UserStats.version, UserStats.updated_at)
+            .where(UserStats.user_id == user_id)
+        )).first()
+        return (row.version, row.updated_at) if row else (0, None)
+
+    def _stats_query(self, user_id: UUID, top: int):
+        """
+        Totals plus both top-N lists as one UNION ALL, so the endpoint is a
+        single round trip of keyed index reads.
+        """
+        def top_pairs(kind: str, mine, other):
+            return select(
+                literal(kind).label("kind"),
+                other.label("user_id"),
+                User.full_name.label("full_name"),
+                User.email.label("email"),
+                QuestionPairCount.count.label("first"),
+                cast(literal(0), Integer).label("second"),
+            )\
+                .join(User, User.id == other)\
+                .where(mine == user_id)\
+                .order_by(QuestionPairCount.count.desc())\
+                .limit(top)\
+                .subquery()
+
+        asked = top_pairs("asked", QuestionPairCount.author_id, QuestionPairCount.recipient_id)
+        received = top_pairs("received", QuestionPairCount.recipient_id, QuestionPairCount.author_id)
+        totals = select(
+            literal("totals").label("kind"),
+            UserStats.user_id,
+            cast(None, String).label("full_name"),
+            cast(None, String).label("email"),
+            UserStats.questions_asked.label("first"),
+            UserStats.questions_answered.label("second"),
+        ).where(UserStats.user_id == user_id)
+        return union_all(totals, select(asked), select(received))
+
+    def _to_stats(self, rows) -> Dict[str, Any]:
+        stats = {
+            "questions_asked": 0,
+            "questions_answered": 0,
+            "top_asked": [],
+            "top_received": [],
+        }
+        for kind, user_id, full_name, email, first, second in rows:
+            if kind == "totals":
+                stats["questions_asked"] = first
+                stats["questions_answered"] = second
+            else:
+                stats[f"top_{kind}"].append({
+                    "user_id": user_id,
+                    "name": full_name or email,
+                    "count": first,
+                })
+        for key in ("top_asked", "top_received"):
+            stats[key].sort(key=lambda entry: entry["count"], reverse=True)
+        return stats
+
+    def get_for_user(self, db: Session, *, user_id: UUID, top: int = 3) -> Dict[str, Any]:
+        rows = db.execute(self._stats_query(user_id, top)).all()
+        return self._to_stats(rows)
+
+    async def get_for_user_async(
+        self, db: AsyncSession, *, user_id: UUID, top: int = 3
+    ) -> Dict[str, Any]:
+        rows = (await db.execute(self._stats_query(user_id, top))).all()
+        return self._to_stats(rows)
+
+
+user_stats = CRUDUserStats(UserStats)
@@ -1,30 +1,11 @@
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from app.core.config import settings
 from app.db.base_class import Base  # noqa
 from app.models.user import User  # noqa
 from app.models.question import Question  # noqa
+from app.models.answer import Answer  # noqa
+from app.models.user_stats import UserStats, QuestionPairCount  # noqa
+from app.models.daily_assignment import DailyAssignment  # noqa
+from app.models.outbox_job import OutboxJob  # noqa
+from app.models.directory_version import DirectoryVersion  # noqa
 
-# Configure engine based on environment
-if settings.ENVIRONMENT == "production":
-    # Production settings with SSL and connection pooling
-    engine = create_engine(
-        str(settings.DATABASE_URL),
-        pool_size=5,
-        max_overflow=10,
-        pool_pre_ping=True,
-        connect_args={"sslmode": "require"}
-    )
-else:
-    # Development settings (unchanged)
-    engine = create_engine(settings.DATABASE_URL)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# The engine and session factory live in app.db.session
+from app.db.session import SessionLocal, engine  # noqa
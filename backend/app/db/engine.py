@@ -0,0 +1,123 @@
+"""
+The one place engines are created, sized from Settings.
+
+Pool modes (DB_POOL_MODE):
+    queue  SQLAlchemy's QueuePool, DB_POOL_SIZE + DB_MAX_OVERFLOW per engine
+    null   no pooling in the app: a connection per checkout, closed on
+           checkin. For PgBouncer in transaction mode, which also means
+           asyncpg can't keep prepared statements across transactions.
+"""
+import logging
+import threading
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import Settings, settings
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ("queue", "null")
+
+
+def engine_options(url: str, config: Settings = settings) -> Dict[str, Any]:
+    """create_engine() keyword arguments for `url` under `config`."""
+    if config.DB_POOL_MODE not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE must be one of {POOL_MODES}, not {config.DB_POOL_MODE!r}")
+    if url.startswith("sqlite"):
+        # SQLAlchemy picks the right pool for file and memory databases
+        return {"poolclass": NullPool} if config.DB_POOL_MODE == "null" else {}
+
+    is_asyncpg = url.startswith("postgresql+asyncpg")
+    connect_args: Dict[str, Any] = {}
+    if config.ENVIRONMENT == "production":
+        connect_args["ssl" if is_asyncpg else "sslmode"] = "require"
+
+    if config.DB_POOL_MODE == "null":
+        if is_asyncpg:
+            # A transaction-mode bouncer hands each transaction to any server
+            # connection, where a statement prepared earlier doesn't exist
+            connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+class PoolUsage:
+    """Connection counts over an engine's lifetime, for the shutdown log."""
+
+    def __init__(self, name: str, engine: Engine) -> None:
+        self.name = name
+        self.engine = engine
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+
+    def on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "engine": self.name,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            # e.g. "Pool size: 5  Connections in pool: 2 Current Overflow: -3 ..."
+            "pool": self.engine.pool.status(),
+        }
+
+
+_usage: List[PoolUsage] = []
+
+
+def track_pool_usage(engine: Engine, name: str) -> PoolUsage:
+    usage = PoolUsage(name, engine)
+    event.listen(engine, "connect", usage.on_connect)
+    event.listen(engine, "checkout", usage.on_checkout)
+    event.listen(engine, "checkin", usage.on_checkin)
+    _usage.append(usage)
+    return usage
+
+
+def create_db_engine(url: str, *, name: str = "sync", config: Settings = settings) -> Engine:
+    engine = create_engine(url, **engine_options(url, config))
+    track_pool_usage(engine, name)
+    return engine
+
+
+def create_async_db_engine(
+    url: str, *, name: str = "async", config: Settings = settings
+) -> AsyncEngine:
+    engine = create_async_engine(url, **engine_options(url, config))
+    track_pool_usage(engine.sync_engine, name)
+    return engine
+
+
+def log_pool_usage() -> None:
+    """Log each engine's connection counts; the app calls this on shutdown."""
+    for usage in _usage:
+        logger.info("Database pool usage", extra=usage.as_dict())
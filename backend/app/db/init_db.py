@@ -1,12 +1,28 @@
-from sqlalchemy.orm import Session
+import os
 
-from app import crud, schemas
-from app.core.config import settings
-from app.db import base  # noqa: F401
-from app.db.session import engine
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
-def init_db() -> None:
-    base.Base.metadata.create_all(bind=engine)
+def init_db(create_all: bool = False) -> None:
+    """
+    Bring the schema up to date with Alembic, as deploys do.
+
+    `create_all` builds the tables straight from the models instead, for
+    scratch SQLite databases; the migration history is Postgres-only.
+    """
+    if create_all:
+        from app.db.base import Base
+        from app.db.session import engine
+
+        Base.metadata.create_all(bind=engine)
+        return
+
+    from alembic import command
+    from alembic.config import Config
+
+    # alembic/env.py reads DATABASE_URL itself
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
 
 if __name__ == "__main__":
     init_db()
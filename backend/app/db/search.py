@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DDL, Table, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Text search configuration for the generated tsvector columns. It's baked
+# into the column definitions, so changing it needs a migration.
+SEARCH_CONFIG = "english"
+
+
+def search_vector_ddl(table: str, source: str = "text") -> str:
+    return (
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_CONFIG}', coalesce({source}, ''))) STORED"
+    )
+
+
+def add_search_vector(table: Table, source: str = "text") -> None:
+    """
+    Give `table` a Postgres-generated `search_vector` column over `source`
+    and a GIN index on it.
+
+    The column is appended after mapping, so the ORM never reads or writes
+    it, and it's a system column, so CREATE TABLE leaves it out. Postgres
+    gets it (and the index) from the after_create DDL below, other dialects
+    don't get it at all and search falls back to app.core.search.
+    """
+    table.append_column(Column("search_vector", TSVECTOR, system=True))
+    for statement in (
+        search_vector_ddl(table.name, source),
+        f"CREATE INDEX ix_{table.name}_search_vector ON {table.name} USING gin (search_vector)",
+    ):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
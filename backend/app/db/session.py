@@ -1,19 +1,41 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
+from app.db.engine import create_async_db_engine, create_db_engine, log_pool_usage
 
-# Use connection pooling for better performance
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=3600,  # Recycle connections after 1 hour
-)
+# The process's engines; pool sizing and mode come from Settings (app.db.engine)
+engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_database_uri(url: str) -> str:
+    """Swap a sync database URL onto the matching asyncio driver."""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+# Async engine for the request handlers, so queries don't block the event loop
+ASYNC_DATABASE_URI = get_async_database_uri(settings.SQLALCHEMY_DATABASE_URI)
+async_engine = create_async_db_engine(ASYNC_DATABASE_URI)
+
+# Objects stay usable after commit; async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+async def dispose_engines() -> None:
+    """Log pool usage and close every pooled connection; run on shutdown."""
+    log_pool_usage()
+    engine.dispose()
+    await async_engine.dispose()
+
 # Create a test database engine when needed
 def get_test_engine():
     """Create a test database engine with minimal pooling."""
@@ -23,3 +45,15 @@ def get_test_engine():
         pool_size=2,
         max_overflow=0,
     )
+
+def get_test_async_engine():
+    """
+    Create an async test database engine.
+
+    Pooled asyncio connections are bound to the event loop that opened them,
+    and every TestClient runs its own loop, so the test engine doesn't pool.
+    """
+    return create_async_engine(
+        get_async_database_uri(settings.DATABASE_TEST_URL),
+        poolclass=NullPool,
+    )
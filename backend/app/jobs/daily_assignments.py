@@ -0,0 +1,32 @@
+"""
+Assign every user their daily question in one bulk statement.
+
+Schedule shortly after UTC midnight, e.g. as a cron job:
+    python -m app.jobs.daily_assignments
+    python -m app.jobs.daily_assignments --date 2026-10-18
+"""
+import argparse
+import logging
+from datetime import date, datetime
+
+from app import crud
+from app.core.logging import setup_logging
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def run(day: date) -> int:
+    db = SessionLocal()
+    try:
+        assigned = crud.daily_assignment.assign_all(db, day=day)
+    finally:
+        db.close()
+    logger.info("Assigned daily questions", extra={"date": day.isoformat(), "assigned": assigned})
+    return assigned
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign daily questions for a day (default: today, UTC).")
+    parser.add_argument("--date", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+    setup_logging()
+    run(args.date or datetime.utcnow().date())
@@ -0,0 +1,25 @@
+"""
+Handlers for the background jobs enqueued by app.jobs.queue.enqueue().
+
+Each runs in its own transaction, which also deletes the job, so it must
+not commit; it should only touch the database through `db`.
+"""
+from typing import Any, Dict
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.jobs.queue import job
+
+
+@job("questions.sent")
+async def count_question_pairs(db: AsyncSession, payload: Dict[str, Any]) -> None:
+    """Per-pair counts behind the top_asked / top_received stats."""
+    await crud.user_stats.record_pair_counts_async(
+        db,
+        pair_counts={
+            (UUID(author_id), UUID(recipient_id)): count
+            for author_id, recipient_id, count in payload["pairs"]
+        },
+    )
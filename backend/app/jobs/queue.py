@@ -0,0 +1,223 @@
+"""
+Background jobs for side effects that don't belong on the request path.
+
+A write that has follow-up work calls enqueue() on its own session. That
+adds an outbox_jobs row to the same transaction, so the job exists exactly
+when the write does, and wakes this process's worker once it commits.
+
+Every app worker runs a JobWorker: an asyncio task that claims due jobs
+(SKIP LOCKED on Postgres, so workers never contend for a row), runs each in
+its own transaction and deletes it in that same transaction. A job's
+effects and its removal commit together, so database-only handlers apply
+exactly once; a failed one is retried with exponential backoff until
+JOBS_MAX_ATTEMPTS. Jobs missed by a wake-up (another process's, or ones
+left by a restart) are picked up by polling every JOBS_POLL_SECONDS.
+
+Handlers are registered with @job("kind") in app.jobs.handlers and take
+(db, payload); payloads are JSON, so ids travel as strings.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, event, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.outbox_job import OutboxJob
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[None]]
+
+handlers: Dict[str, Handler] = {}
+
+
+def job(kind: str) -> Callable[[Handler], Handler]:
+    """Register the decorated coroutine as the handler for `kind`."""
+    def register(handler: Handler) -> Handler:
+        handlers[kind] = handler
+        return handler
+    return register
+
+
+def enqueue(db: AsyncSession, kind: str, **payload: Any) -> None:
+    """
+    Add a job to `db`'s transaction. It runs after the caller commits, and
+    never if the caller rolls back.
+    """
+    db.add(OutboxJob(kind=kind, payload=payload))
+    db.info["wake_job_worker"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_after_commit(session: Session) -> None:
+    # AsyncSession.info is its sync session's, so this sees enqueue()'s flag
+    if session.info.pop("wake_job_worker", False) and _worker is not None:
+        _worker.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop("wake_job_worker", None)
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before retrying a job that has failed `attempts` times."""
+    return min(
+        settings.JOBS_RETRY_MAX_SECONDS,
+        settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+    )
+
+
+class JobWorker:
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker,
+        *,
+        batch_size: int = settings.JOBS_BATCH_SIZE,
+        poll_seconds: float = settings.JOBS_POLL_SECONDS,
+    ) -> None:
+        import app.jobs.handlers  # noqa: F401 (registers the job kinds)
+
+        self.sessionmaker = sessionmaker
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _claim_statement(self, now: datetime, lease_id: uuid.UUID):
+        """
+        Lease up to batch_size due jobs in one statement. On Postgres the
+        inner SELECT skips rows another worker has locked; SQLite, which
+        serializes writers anyway, renders it without FOR UPDATE.
+        """
+        due = select(OutboxJob.id)\
+            .where(
+                OutboxJob.available_at <= now,
+                OutboxJob.attempts < settings.JOBS_MAX_ATTEMPTS,
+                or_(OutboxJob.lease_expires_at.is_(None), OutboxJob.lease_expires_at < now),
+            )\
+            .order_by(OutboxJob.available_at)\
+            .limit(self.batch_size)\
+            .with_for_update(skip_locked=True)
+        return update(OutboxJob)\
+            .where(OutboxJob.id.in_(due.scalar_subquery()))\
+            .values(
+                lease_id=lease_id,
+                lease_expires_at=now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+                attempts=OutboxJob.attempts + 1,
+            )\
+            .returning(OutboxJob.id, OutboxJob.kind, OutboxJob.payload, OutboxJob.attempts)\
+            .execution_options(synchronize_session=False)
+
+    async def _claim(self, lease_id: uuid.UUID) -> List[Any]:
+        async with self.sessionmaker() as db:
+            rows = (await db.execute(self._claim_statement(datetime.utcnow(), lease_id))).all()
+            await db.commit()
+        return rows
+
+    async def _run(self, row: Any, lease_id: uuid.UUID) -> bool:
+        """Run one claimed job; True if it completed."""
+        # Fenced on the lease: if it lapsed and another worker took the job,
+        # this run's effects are rolled back rather than applied twice
+        mine = (OutboxJob.id == row.id, OutboxJob.lease_id == lease_id)
+        async with self.sessionmaker() as db:
+            try:
+                handler = handlers.get(row.kind)
+                if handler is None:
+                    raise LookupError(f"no handler for job kind {row.kind!r}")
+                await handler(db, row.payload)
+                result = await db.execute(delete(OutboxJob).where(*mine))
+                if result.rowcount != 1:
+                    await db.rollback()
+                    logger.warning("Lost the lease on job %s, discarding this run", row.id)
+                    return False
+                await db.commit()
+                return True
+            except Exception as e:
+                await db.rollback()
+                gave_up = row.attempts >= settings.JOBS_MAX_ATTEMPTS
+                logger.log(
+                    logging.ERROR if gave_up else logging.WARNING,
+                    "Job %s (%s) failed on attempt %d%s",
+                    row.id, row.kind, row.attempts, ", giving up" if gave_up else "",
+                    exc_info=True,
+                )
+                await db.execute(
+                    update(OutboxJob)
+                    .where(*mine)
+                    .values(
+                        available_at=datetime.utcnow() + timedelta(seconds=retry_delay(row.attempts)),
+                        lease_id=None,
+                        lease_expires_at=None,
+                        last_error=repr(e)[:2000],
+                    )
+                )
+                await db.commit()
+                return False
+
+    async def run_due(self) -> int:
+        """Run jobs until none are due; returns how many completed."""
+        completed = 0
+        while True:
+            lease_id = uuid.uuid4()
+            rows = await self._claim(lease_id)
+            for row in rows:
+                completed += await self._run(row, lease_id)
+            if len(rows) < self.batch_size:
+                return completed
+
+    def wake(self) -> None:
+        """Run due jobs now rather than at the next poll. Thread-safe."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _serve(self) -> None:
+        while True:
+            # Cleared before the pass, so a wake-up during it isn't lost
+            self._wakeup.clear()
+            try:
+                await self.run_due()
+            except Exception:
+                logger.exception("Job worker pass failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._serve())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_worker: Optional[JobWorker] = None
+
+
+def start_job_worker(sessionmaker: async_sessionmaker) -> JobWorker:
+    """Start this process's worker on the running loop (app startup)."""
+    global _worker
+    _worker = JobWorker(sessionmaker)
+    _worker.start()
+    return _worker
+
+
+async def stop_job_worker() -> None:
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
@@ -1,7 +1,15 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import auth, users, questions, answers
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.logging import setup_logging
+from app.core.notifications import start_question_listener, stop_question_listener
+from app.core.security import shutdown_password_hasher
+from app.db.session import AsyncSessionLocal, dispose_engines
+from app.jobs.queue import start_job_worker, stop_job_worker
+
+setup_logging()
 
 app = FastAPI(title="Alexandria's Journal API")
 
@@ -15,12 +23,53 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
+if settings.METRICS_ENABLED:
+    # prometheus_client is only imported when metrics are on
+    from app.core.metrics import install_metrics
+
+    install_metrics(app)
+
 # Include routers
 app.include_router(auth.router, prefix="/api", tags=["auth"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(questions.router, prefix="/api/questions", tags=["questions"])
 app.include_router(answers.router, prefix="/api/answers", tags=["answers"])
 
+@app.on_event("shutdown")
+def shutdown_workers():
+    shutdown_password_hasher()
+
+@app.on_event("startup")
+async def start_jobs():
+    if settings.JOBS_ENABLED:
+        start_job_worker(AsyncSessionLocal)
+
+@app.on_event("startup")
+async def start_notifications():
+    start_question_listener()
+
+@app.on_event("shutdown")
+async def stop_notifications():
+    await stop_question_listener()
+
+# Before close_database; a job cut off mid-run rolls back, and is retried
+# once its lease lapses
+@app.on_event("shutdown")
+async def stop_jobs():
+    await stop_job_worker()
+
+@app.on_event("shutdown")
+async def close_database():
+    await dispose_engines()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Alexandria's Journal API"}
@@ -2,5 +2,9 @@ from app.db.base import Base
 from .user import User
 from .question import Question
 from .answer import Answer
+from .user_stats import UserStats, QuestionPairCount
+from .daily_assignment import DailyAssignment
+from .outbox_job import OutboxJob
+from .directory_version import DirectoryVersion
 
-__all__ = ["Base", "User", "Question", "Answer"]
+__all__ = ["Base", "User", "Question", "Answer", "UserStats", "QuestionPairCount", "DailyAssignment", "OutboxJob", "DirectoryVersion"]
@@ -1,18 +1,31 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, Date, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from app.db.base_class import Base
+from app.db.types import GUID
+from app.db.search import add_search_vector
 
 class Answer(Base):
     __tablename__ = "answers"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    question_id = Column(String(36), ForeignKey("questions.id"), nullable=False)
-    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    question_id = Column(GUID, ForeignKey("questions.id"), nullable=False)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False)
     text = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set on daily-question answers only; at most one per user per day
+    answered_on = Column(Date, nullable=True)
 
     question = relationship("Question", back_populates="answers")
     user = relationship("User", back_populates="answers")
+
+    __table_args__ = (
+        # Serves per-user listings and the answered-today check
+        Index("ix_answers_user_id_created_at", "user_id", "created_at"),
+        Index("uq_answers_user_id_answered_on", "user_id", "answered_on", unique=True),
+    )
+
+# Full-text search over text (Postgres only)
+add_search_vector(Answer.__table__)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Date, ForeignKey
+from sqlalchemy.orm import relationship
+from app.db.base_class import Base
+from app.db.types import GUID
+
+class DailyAssignment(Base):
+    """The question a user is shown on a given (UTC) day."""
+    __tablename__ = "daily_assignments"
+
+    user_id = Column(GUID, ForeignKey("users.id"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    question_id = Column(GUID, ForeignKey("questions.id"), nullable=False)
+
+    question = relationship("Question")
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from app.db.base_class import Base
+
+class DirectoryVersion(Base):
+    """
+    A counter per shared listing, bumped in the same transaction as every
+    write that changes it. The ETag of /users/ is the "users" row.
+    """
+    __tablename__ = "directory_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=True)
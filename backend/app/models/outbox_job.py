@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+from app.db.base_class import Base
+from app.db.types import GUID
+
+class OutboxJob(Base):
+    """
+    A side effect to run once the transaction that wrote it commits
+    (app.jobs.queue). The transaction that runs a job deletes it; one that
+    used up JOBS_MAX_ATTEMPTS stays, with its last error, for inspection.
+    """
+    __tablename__ = "outbox_jobs"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    kind = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Set while a worker runs the job; a lapsed lease lets another take it
+    lease_id = Column(GUID, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_outbox_jobs_available_at", "available_at"),
+    )
@@ -1,15 +1,17 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Boolean, Index, false
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from app.db.base_class import Base
+from app.db.types import GUID
+from app.db.search import add_search_vector
 
 class Question(Base):
     __tablename__ = "questions"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    author_id = Column(String(36), ForeignKey("users.id"))
-    recipient_id = Column(String(36), ForeignKey("users.id"))
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    author_id = Column(GUID, ForeignKey("users.id"))
+    recipient_id = Column(GUID, ForeignKey("users.id"))
     text = Column(String)
     is_daily_question = Column(Boolean, default=False)
     is_answered = Column(Boolean, default=False)
@@ -18,3 +20,20 @@ class Question(Base):
     author = relationship("User", foreign_keys=[author_id], back_populates="questions_asked")
     recipient = relationship("User", foreign_keys=[recipient_id], back_populates="questions_received")
     answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Serves the daily-question lookup: unanswered questions per recipient
+        Index(
+            "ix_questions_recipient_id_unanswered",
+            "recipient_id",
+            "created_at",
+            postgresql_where=(is_answered == false()),
+            sqlite_where=(is_answered == false()),
+        ),
+        # Keyset pages of sent and received questions
+        Index("ix_questions_author_id_created_at", "author_id", "created_at"),
+        Index("ix_questions_recipient_id_created_at", "recipient_id", "created_at"),
+    )
+
+# Full-text search over text (Postgres only)
+add_search_vector(Question.__table__)
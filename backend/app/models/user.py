@@ -3,11 +3,12 @@ from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
 from app.db.base_class import Base
+from app.db.types import GUID
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     full_name = Column(String)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Index
+from app.db.base_class import Base
+from app.db.types import GUID
+
+class UserStats(Base):
+    """Running per-user counters behind /users/me/stats."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(GUID, ForeignKey("users.id"), primary_key=True)
+    questions_asked = Column(Integer, nullable=False, default=0, server_default="0")
+    questions_answered = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every write that changes what the user's own views show;
+    # the ETags of /answers/me, /questions/daily and /users/me/stats use it
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, nullable=True)
+
+class QuestionPairCount(Base):
+    """How many questions `author_id` has sent to `recipient_id`."""
+    __tablename__ = "question_pair_counts"
+
+    author_id = Column(GUID, ForeignKey("users.id"), primary_key=True)
+    recipient_id = Column(GUID, ForeignKey("users.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_question_pair_counts_author_id_count", "author_id", "count"),
+        Index("ix_question_pair_counts_recipient_id_count", "recipient_id", "count"),
+    )
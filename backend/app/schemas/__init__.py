@@ -1,13 +1,18 @@
 from .user import User, UserCreate, UserUpdate
-from .question import Question, QuestionCreate, QuestionUpdate
-from .answer import Answer, AnswerCreate, AnswerUpdate
+from .question import (
+    Question, QuestionCreate, QuestionUpdate, QuestionBulkCreate, QuestionBulkItem, QuestionFlat
+)
+from .answer import Answer, AnswerCreate, AnswerUpdate, AnswerFlat, NormalizedAnswers
 from .token import Token, TokenPayload
 from .stats import UserStats, UserInteractionStats
+from .page import Page
 
 __all__ = [
     "User", "UserCreate", "UserUpdate",
-    "Question", "QuestionCreate", "QuestionUpdate",
-    "Answer", "AnswerCreate", "AnswerUpdate",
+    "Question", "QuestionCreate", "QuestionUpdate", "QuestionBulkCreate", "QuestionBulkItem",
+    "QuestionFlat",
+    "Answer", "AnswerCreate", "AnswerUpdate", "AnswerFlat", "NormalizedAnswers",
     "Token", "TokenPayload",
-    "UserStats", "UserInteractionStats"
+    "UserStats", "UserInteractionStats",
+    "Page"
 ]
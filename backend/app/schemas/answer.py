@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from uuid import UUID
-from app.schemas.question import Question
+from app.schemas.question import Question, QuestionFlat, UserBase
 
 
 class AnswerBase(BaseModel):
@@ -18,14 +18,29 @@ class AnswerUpdate(AnswerBase):
     pass
 
 
-class Answer(AnswerBase):
+class AnswerFlat(AnswerBase):
+    """An Answer without its nested question, for normalized responses."""
     id: UUID
     question_id: UUID
     user_id: UUID
     created_at: datetime
     updated_at: datetime
+
+
+class Answer(AnswerFlat):
     question: Question
 
     class Config:
         orm_mode = True  # Required for Pydantic v1 ORM model conversion
         from_attributes = True  # This will be ignored in v1 but ready for v2
+
+
+class NormalizedAnswers(BaseModel):
+    """
+    Answers with their questions and the questions' authors in side
+    tables, each listed once, instead of nested into every answer.
+    """
+    answers: List[AnswerFlat]
+    questions: List[QuestionFlat]
+    users: List[UserBase]
+    next_cursor: Optional[str] = None
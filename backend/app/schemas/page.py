@@ -0,0 +1,9 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+ItemType = TypeVar("ItemType")
+
+class Page(BaseModel, Generic[ItemType]):
+    """One keyset page; pass `next_cursor` back as `cursor` for the next one."""
+    items: List[ItemType]
+    next_cursor: Optional[str] = None
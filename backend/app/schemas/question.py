@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from uuid import UUID
@@ -18,15 +18,27 @@ class QuestionBase(BaseModel):
 class QuestionCreate(QuestionBase):
     pass
 
+class QuestionBulkItem(QuestionBase):
+    recipient_id: UUID
+
+class QuestionBulkCreate(BaseModel):
+    """Send `text` to everyone in `recipient_ids`, plus any individual `questions`."""
+    text: Optional[str] = None
+    recipient_ids: List[UUID] = []
+    questions: List[QuestionBulkItem] = []
+
 class QuestionUpdate(QuestionBase):
     pass
 
-class Question(QuestionBase):
+class QuestionFlat(QuestionBase):
+    """A Question without its nested author, for normalized responses."""
     id: UUID
     author_id: UUID
     recipient_id: UUID
     is_daily_question: bool
     created_at: datetime
+
+class Question(QuestionFlat):
     author: Optional[UserBase] = None
 
     class Config:
@@ -1,8 +1,9 @@
 from typing import List
+from uuid import UUID
 from pydantic import BaseModel
 
 class UserInteractionStats(BaseModel):
-    user_id: str
+    user_id: UUID
     name: str
     count: int
 
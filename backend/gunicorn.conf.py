@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for the API (used by the Procfile and render.yaml).
+
+The app is imported once in the master and the workers are forked from
+it, so a deploy pays for the imports once rather than per worker, and a
+restarted worker is up as soon as it forks.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# uvicorn's worker with bounded graceful shutdown, for open event streams
+worker_class = "app.core.uvicorn_worker.UvicornWorker"
+preload_app = True
+
+
+def post_fork(server, worker):
+    # The master never connects, but make sure no pooled connection is
+    # shared across processes. close=False leaves the parent's sockets alone.
+    from app.db.session import async_engine, engine
+
+    for pooled in (engine, async_engine.sync_engine):
+        pooled.dispose(close=False)
@@ -1,10 +1,15 @@
 """
 Database initialization script.
+
+    python init_db.py               # alembic upgrade head
+    python init_db.py --create-all  # tables from the models, scratch SQLite only
 """
-from app.db.base import Base
-from app.db.session import engine
+import sys
+
+from app.db.init_db import init_db
 
-def init_db():
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+if __name__ == "__main__":
+    create_all = "--create-all" in sys.argv[1:]
+    print("Creating database tables..." if create_all else "Running migrations...")
+    init_db(create_all=create_all)
+    print("Database is up to date.")
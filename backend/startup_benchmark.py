@@ -0,0 +1,187 @@
+"""
+Cold-start benchmark for the API process.
+
+Starts the app in fresh interpreters, one after another, and reports the
+median, min and max of:
+
+    import_ms         importing the app module (what each gunicorn master
+                      or un-preloaded worker pays before it can serve)
+    first_request_ms  the first authenticated request, including the first
+                      database connection and lazily imported modules
+    process_ms        the whole child process, interpreter start to exit
+
+Run with:
+    python startup_benchmark.py --runs 10 --output startup.json
+    python startup_benchmark.py --baseline startup.json
+    python startup_benchmark.py --profile 20    # slowest imports, one run
+
+The database (scratch SQLite by default) gets the tables created if they
+are missing; the first request looks up a user that doesn't exist.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+METRICS = ("import_ms", "first_request_ms", "process_ms")
+
+
+def _child(app_path: str) -> None:
+    """Runs in the measured interpreter; prints its timings as JSON."""
+    import asyncio
+    import importlib
+
+    started = time.perf_counter()
+    module_name, _, attr = app_path.partition(":")
+    app = getattr(importlib.import_module(module_name), attr or "app")
+    imported = time.perf_counter()
+
+    import httpx
+    from app.core.security import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token('startup@example.com')}"}
+
+    async def first_request() -> int:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            return (await client.get("/api/users/me", headers=headers)).status_code
+
+    before = time.perf_counter()
+    status = asyncio.run(first_request())
+    done = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "first_request_ms": (done - before) * 1000,
+        "status": status,
+    }))
+
+
+def _child_env(database_url: str) -> Dict[str, str]:
+    env = dict(os.environ, DATABASE_URL=database_url, LOG_LEVEL="WARNING")
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "")
+    return env
+
+
+def measure_once(app_path: str, database_url: str) -> Dict[str, float]:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", app_path],
+        env=_child_env(database_url), capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    process_ms = (time.perf_counter() - started) * 1000
+    timings = json.loads(output.strip().splitlines()[-1])
+    if timings.pop("status") != 404:
+        raise RuntimeError(f"unexpected first response: {timings}")
+    return dict(timings, process_ms=process_ms)
+
+
+def summarize(runs: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        metric: {
+            "median": statistics.median(run[metric] for run in runs),
+            "min": min(run[metric] for run in runs),
+            "max": max(run[metric] for run in runs),
+        }
+        for metric in METRICS
+    }
+
+
+def find_regressions(
+    summary: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+    max_regression: float,
+) -> List[str]:
+    """Metrics whose median grew by more than `max_regression` (0.2 = 20%)."""
+    regressions = []
+    for metric, current in summary.items():
+        before = baseline.get(metric)
+        if before and before["median"] > 0:
+            change = current["median"] / before["median"] - 1
+            if change > max_regression:
+                regressions.append(
+                    f"{metric}: {before['median']:.0f}ms -> {current['median']:.0f}ms (+{change:.0%})"
+                )
+    return regressions
+
+
+def profile_imports(app_path: str, database_url: str, top: int) -> List[str]:
+    """The `top` modules with the largest cumulative import time."""
+    module_name = app_path.partition(":")[0]
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        env=_child_env(database_url), capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    return [
+        f"{cumulative / 1000:>9.1f} {self_time / 1000:>9.1f}  {name}"
+        for cumulative, self_time, name in rows[:top]
+    ]
+
+
+def ensure_schema(database_url: str) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    from sqlalchemy import create_engine
+    from app.db.base import Base
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="main:app", help="module:attribute of the ASGI app")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", type=int, metavar="N", help="print the N slowest imports instead")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed growth of each median over the baseline (default 0.2 = 20%%)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.child:
+        _child(args.child)
+        return 0
+
+    if args.profile:
+        print(f"{'cum ms':>9} {'self ms':>9}  module")
+        print("\n".join(profile_imports(args.app, args.database_url, args.profile)))
+        return 0
+
+    ensure_schema(args.database_url)
+    runs = [measure_once(args.app, args.database_url) for _ in range(args.runs)]
+    summary = summarize(runs)
+    print(f"{'metric':<18}{'median':>10}{'min':>10}{'max':>10}   ({args.runs} runs)")
+    for metric, s in summary.items():
+        print(f"{metric:<18}{s['median']:>10.0f}{s['min']:>10.0f}{s['max']:>10.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(summary, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
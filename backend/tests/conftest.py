@@ -1,21 +1,89 @@
+import asyncio
 import pytest
-from typing import Generator, Dict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Generator, Dict, List, Optional
+from uuid import uuid4
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.cache import user_cache
+from app.core.rate_limit import MemoryRateLimitStore, get_rate_limit_store
 from app.core.config import settings
+from app.core.security import create_access_token
 from app.db.base import Base
-from app.db.session import get_test_engine
+from app.db.session import get_test_async_engine, get_test_engine
+from app.jobs.queue import JobWorker
 from app.main import app
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_async_sessionmaker
+from app.models.answer import Answer as AnswerModel
+from app.models.question import Question as QuestionModel
 
 # Set testing flag
 settings.TESTING = True
+# Tests drain the job queue themselves, with run_jobs()
+settings.JOBS_ENABLED = False
 
 # Create test database engine
 test_engine = get_test_engine()
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+test_async_engine = get_test_async_engine()
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=test_async_engine, autoflush=False, expire_on_commit=False
+)
+
+def auth_headers(user: dict) -> dict:
+    """Bearer header for one of the test_user fixtures."""
+    return {"Authorization": f"Bearer {create_access_token(user['email'])}"}
+
+def create_question(
+    db: Session, *, author: dict, recipient: dict, text: str,
+    created_at: Optional[datetime] = None
+) -> str:
+    """Insert an unanswered question and return its id."""
+    question_id = str(uuid4())
+    db.add(QuestionModel(
+        id=question_id,
+        text=text,
+        author_id=author["id"],
+        recipient_id=recipient["id"],
+        is_daily_question=False,
+        is_answered=False,
+        created_at=created_at or datetime.utcnow()
+    ))
+    db.commit()
+    return question_id
+
+def run_jobs() -> int:
+    """Run every due background job, as the app's worker would; returns how many completed."""
+    return asyncio.run(JobWorker(TestingAsyncSessionLocal).run_due())
+
+def seed_answers(db: Session, *, author: dict, user: dict, count: int) -> None:
+    """Insert `count` answered questions, two per day from 2025-01-01."""
+    base = datetime(2025, 1, 1)
+    for i in range(count):
+        # Pairs of rows share a timestamp so id tie-breakers are exercised
+        created_at = base + timedelta(days=i // 2)
+        question = QuestionModel(
+            id=str(uuid4()),
+            text=f"Question {i}",
+            author_id=author["id"],
+            recipient_id=user["id"],
+            is_answered=True,
+            created_at=created_at
+        )
+        db.add(question)
+        db.add(AnswerModel(
+            id=str(uuid4()),
+            text=f"Answer {i}",
+            question_id=question.id,
+            user_id=user["id"],
+            created_at=created_at,
+            updated_at=created_at
+        ))
+    db.commit()
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_db():
@@ -36,21 +104,53 @@ def db() -> Generator:
             db.execute(table.delete())
         db.commit()
         db.close()
+        user_cache.clear()
 
 @pytest.fixture(scope="function")
 def client(db) -> Generator:
     """Get a test client with database dependency override."""
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            db.close()
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
 
-    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_sessionmaker] = lambda: TestingAsyncSessionLocal
+    # A fresh in-process store per test, standing in for whatever the app uses
+    rate_limit_store = MemoryRateLimitStore()
+    app.dependency_overrides[get_rate_limit_store] = lambda: rate_limit_store
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
+@pytest.fixture(scope="function")
+def count_queries():
+    """
+    Context manager that records the SQL statements sent to the test database
+    through either engine, e.g.
+
+        with count_queries() as statements:
+            client.get(...)
+        assert len(statements) == 2
+    """
+    engines = [test_engine, test_async_engine.sync_engine]
+
+    @contextmanager
+    def counter() -> Generator[List[str], None, None]:
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", record)
+
+    return counter
+
 @pytest.fixture(scope="function")
 def test_user(db) -> Dict[str, str]:
     """Create a test user."""
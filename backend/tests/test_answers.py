@@ -0,0 +1,191 @@
+import asyncio
+from types import SimpleNamespace
+from uuid import UUID
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app import crud
+from app.main import app
+from app.models.answer import Answer as AnswerModel
+from app.models.question import Question as QuestionModel
+from tests.conftest import auth_headers, create_question, run_jobs
+
+def test_answer_daily_question(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    question_id = create_question(
+        db, author=test_user2, recipient=test_user, text="What was your first job?"
+    )
+    headers = auth_headers(test_user)
+
+    response = client.get("/api/questions/daily", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == question_id
+    assert response.json()["author"]["email"] == test_user2["email"]
+
+    response = client.post(
+        f"/api/questions/daily/{question_id}/answer",
+        headers=headers,
+        json={"text": "Paper route"}
+    )
+    assert response.status_code == 200
+    assert response.json()["question"]["id"] == question_id
+
+    # Only one answer per day
+    response = client.get("/api/questions/daily", headers=headers)
+    assert response.status_code == 404
+
+    response = client.get("/api/answers/me", headers=headers)
+    assert response.status_code == 200
+    answers = response.json()
+    assert [a["text"] for a in answers] == ["Paper route"]
+    assert answers[0]["question"]["author"]["email"] == test_user2["email"]
+
+    response = client.get("/api/answers/me/past", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+def test_update_answer(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    question_id = create_question(
+        db, author=test_user2, recipient=test_user, text="Favourite meal?"
+    )
+    response = client.post(
+        "/api/answers/",
+        headers=auth_headers(test_user),
+        json={"text": "Soup", "question_id": question_id}
+    )
+    assert response.status_code == 200
+    answer_id = response.json()["id"]
+
+    response = client.put(
+        f"/api/answers/{answer_id}",
+        headers=auth_headers(test_user2),
+        json={"text": "Not mine"}
+    )
+    assert response.status_code == 403
+
+    response = client.put(
+        f"/api/answers/{answer_id}",
+        headers=auth_headers(test_user),
+        json={"text": "Stew"}
+    )
+    assert response.status_code == 200
+    assert response.json()["text"] == "Stew"
+
+def test_user_stats(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    for i in range(3):
+        response = client.post(
+            f"/api/questions/user-question/{test_user2['id']}",
+            headers=auth_headers(test_user),
+            json={"text": f"Q{i}"}
+        )
+        assert response.status_code == 200
+    response = client.post(
+        f"/api/questions/user-question/{test_user['id']}",
+        headers=auth_headers(test_user2),
+        json={"text": "Back to you"}
+    )
+    question_id = response.json()["id"]
+    response = client.post(
+        f"/api/questions/daily/{question_id}/answer",
+        headers=auth_headers(test_user),
+        json={"text": "Sure"}
+    )
+    assert response.status_code == 200
+    # The per-pair counts behind top_asked / top_received are a background job
+    run_jobs()
+
+    response = client.get("/api/users/me/stats", headers=auth_headers(test_user))
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["questions_asked"] == 3
+    assert stats["questions_answered"] == 1
+    assert stats["top_asked"] == [
+        {"user_id": test_user2["id"], "name": test_user2["full_name"], "count": 3}
+    ]
+
+    response = client.get("/api/users/me/stats", headers=auth_headers(test_user2))
+    stats = response.json()
+    assert stats["questions_asked"] == 1
+    assert stats["questions_answered"] == 0
+    assert stats["top_received"] == [
+        {"user_id": test_user["id"], "name": test_user["full_name"], "count": 3}
+    ]
+
+    response = client.get("/api/questions/received", headers=auth_headers(test_user2))
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+def test_daily_answer_is_atomic_under_concurrency(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    first = create_question(db, author=test_user2, recipient=test_user, text="One?")
+    second = create_question(db, author=test_user2, recipient=test_user, text="Two?")
+    headers = auth_headers(test_user)
+
+    async def submit_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*(
+                http.post(
+                    f"/api/questions/daily/{question_id}/answer",
+                    headers=headers,
+                    json={"text": f"Answer {i}"}
+                )
+                for i, question_id in enumerate([first, first, second])
+            ))
+
+    responses = asyncio.run(submit_all())
+    assert sorted(r.status_code for r in responses) == [200, 400, 400]
+    db.expire_all()
+    assert db.query(AnswerModel).filter(AnswerModel.user_id == test_user["id"]).count() == 1
+    assert db.query(QuestionModel).filter(QuestionModel.is_answered.is_(True)).count() == 1
+
+def test_daily_answer_statements(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict, count_queries
+):
+    question_id = create_question(db, author=test_user2, recipient=test_user, text="Pets?")
+    headers = auth_headers(test_user)
+    client.get("/api/questions/daily", headers=headers)  # warms the user cache
+
+    with count_queries() as statements:
+        response = client.post(
+            f"/api/questions/daily/{question_id}/answer",
+            headers=headers,
+            json={"text": "A cat"}
+        )
+    assert response.status_code == 200
+    assert response.json()["question"]["author"]["email"] == test_user2["email"]
+    # Claim (plus the author's row where the dialect can't join it into
+    # the claim), the answer and the stats counter; no pre-checks
+    if db.bind.dialect.name == "postgresql":
+        expected = ["WITH", "INSERT", "INSERT"]
+    else:
+        expected = ["UPDATE", "SELECT", "INSERT", "INSERT"]
+    assert [s.split()[0] for s in statements] == expected
+
+
+def test_claim_loads_the_author_in_one_statement_on_postgres():
+    postgres_db = SimpleNamespace(bind=SimpleNamespace(dialect=postgresql.dialect()))
+    statement = crud.answer._claim_statement(postgres_db, "question-id", "user-id")
+    sql = " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+    assert sql.startswith("WITH claimed AS (UPDATE questions SET is_answered=")
+    assert "LEFT OUTER JOIN users ON users.id = claimed.author_id" in sql
+
+def test_counter_upserts_lock_rows_in_key_order():
+    postgres_db = SimpleNamespace(bind=SimpleNamespace(dialect=postgresql.dialect()))
+    a, b = UUID(int=1), UUID(int=2)
+    # B asks A: the author comes first in the counts, but A's row is locked first
+    asked = crud.user_stats._asked_statement(postgres_db, {(b, a): 1})
+    params = asked.compile(dialect=postgresql.dialect()).params
+    assert [params["user_id_m0"], params["user_id_m1"]] == [a, b]
+
+    pairs = crud.user_stats._pair_count_statement(postgres_db, {(b, a): 1, (a, b): 1})
+    params = pairs.compile(dialect=postgresql.dialect()).params
+    assert [(params["author_id_m0"], params["recipient_id_m0"]),
+            (params["author_id_m1"], params["recipient_id_m1"])] == [(a, b), (b, a)]
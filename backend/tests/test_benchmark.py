@@ -0,0 +1,27 @@
+import asyncio
+import httpx
+from fastapi.testclient import TestClient
+from app.main import app
+from benchmark import find_regressions, run_benchmark, seed
+from tests.conftest import test_engine
+
+def test_benchmark_smoke(client: TestClient):
+    # `client` installs the test database overrides on `app`
+    users = seed(test_engine, users=3, questions=4)
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await run_benchmark(
+                http, users, requests=4, concurrency=2, token_path="/api/token"
+            )
+
+    results = asyncio.run(run())
+    summaries = {name: result.summary() for name, result in results.items()}
+    assert summaries["GET /answers/me"]["requests"] == 4
+    assert summaries["POST /questions/daily/{id}/answer"]["requests"] == 3
+    assert all(s["errors"] == 0 for s in summaries.values()), summaries
+
+    slower = {name: dict(s, p95_ms=s["p95_ms"] * 2) for name, s in summaries.items()}
+    assert find_regressions(summaries, summaries, 0.2) == []
+    assert len(find_regressions(slower, summaries, 0.2)) == len(summaries)
@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.models.question import Question
+from tests.conftest import auth_headers, run_jobs
+
+def test_bulk_create_questions(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict,
+    test_superuser: dict, count_queries
+):
+    with count_queries() as statements:
+        response = client.post(
+            "/api/questions/bulk",
+            headers=auth_headers(test_user),
+            json={
+                "text": "Where did you grow up?",
+                "recipient_ids": [test_user2["id"], test_superuser["id"]],
+                "questions": [{"recipient_id": test_user2["id"], "text": "Favourite song?"}],
+            }
+        )
+    assert response.status_code == 200
+    created = response.json()
+    assert [(q["recipient_id"], q["text"]) for q in created] == [
+        (test_user2["id"], "Where did you grow up?"),
+        (test_superuser["id"], "Where did you grow up?"),
+        (test_user2["id"], "Favourite song?"),
+    ]
+    assert all(q["author"]["email"] == test_user["email"] for q in created)
+    # User lookup, one multi-row INSERT, a counter upsert and the pair-count job
+    inserts = [s for s in statements if s.startswith("INSERT INTO questions")]
+    assert len(inserts) == 1
+
+    assert db.query(Question).filter(Question.author_id == test_user["id"]).count() == 3
+    assert run_jobs() == 1
+    stats = client.get("/api/users/me/stats", headers=auth_headers(test_user)).json()
+    assert stats["questions_asked"] == 3
+    assert stats["top_asked"][0] == {
+        "user_id": test_user2["id"], "name": test_user2["full_name"], "count": 2
+    }
+
+def test_bulk_create_validation(client: TestClient, test_user: dict, test_user2: dict):
+    headers = auth_headers(test_user)
+    response = client.post("/api/questions/bulk", headers=headers, json={})
+    assert response.status_code == 400
+    response = client.post(
+        "/api/questions/bulk", headers=headers, json={"recipient_ids": [test_user2["id"]]}
+    )
+    assert response.status_code == 400
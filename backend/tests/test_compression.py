@@ -0,0 +1,121 @@
+import gzip
+import zlib
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from app.core.compression import CompressionMiddleware, accepted_encodings
+from tests.conftest import auth_headers, create_question, seed_answers
+
+def make_client(**options) -> TestClient:
+    async def big(request):
+        return PlainTextResponse("x" * 2000)
+
+    async def small(request):
+        return PlainTextResponse("tiny")
+
+    async def stream(request):
+        async def chunks():
+            for i in range(3):
+                yield f"row {i}\n" * 100
+        return StreamingResponse(chunks(), media_type="text/csv")
+
+    async def events(request):
+        async def chunks():
+            yield "data: hello\n\n" * 100
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    routes = [Route("/big", big), Route("/small", small), Route("/stream", stream), Route("/events", events)]
+    app = Starlette(routes=routes)
+    app.add_middleware(CompressionMiddleware, **options)
+    return TestClient(app)
+
+def raw_get(client: TestClient, url: str, accept: str):
+    """GET without httpx decoding the body, so the encoded bytes can be checked."""
+    with client.stream("GET", url, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+def test_accepted_encodings_honours_q_values():
+    assert accepted_encodings("gzip, br;q=0.5") == {"gzip", "br"}
+    assert accepted_encodings("br;q=0, gzip;q=1.0") == {"gzip"}
+    assert accepted_encodings("identity") == {"identity"}
+    assert accepted_encodings("") == set()
+
+def test_gzip_above_the_threshold_only():
+    client = make_client(minimum_size=1024)
+    response, body = raw_get(client, "/big", "gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) == len(body) < 2000
+    assert gzip.decompress(body) == b"x" * 2000
+
+    response, body = raw_get(client, "/small", "gzip")
+    assert "Content-Encoding" not in response.headers
+    assert body == b"tiny"
+
+    response, body = raw_get(client, "/big", "identity")
+    assert "Content-Encoding" not in response.headers
+    assert len(body) == 2000
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk():
+    client = make_client()
+    response, body = raw_get(client, "/stream", "gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    expected = "".join(f"row {i}\n" * 100 for i in range(3)).encode()
+    assert zlib.decompress(body, 16 + zlib.MAX_WBITS) == expected
+
+def test_event_streams_are_left_alone():
+    response, body = raw_get(make_client(), "/events", "gzip")
+    assert "Content-Encoding" not in response.headers
+    assert body.startswith(b"data: hello")
+
+def test_brotli_preferred_when_installed():
+    brotli = pytest.importorskip("brotli")
+    response, body = raw_get(make_client(), "/big", "gzip, br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(body) == b"x" * 2000
+
+def test_answers_me_is_compressed(client: TestClient, db: Session, test_user: dict, test_user2: dict):
+    seed_answers(db, author=test_user2, user=test_user, count=20)
+    with client.stream(
+        "GET", "/api/answers/me", headers={**auth_headers(test_user), "Accept-Encoding": "gzip"}
+    ) as response:
+        body = b"".join(response.iter_raw())
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(body) < len(gzip.decompress(body)) // 3
+
+def test_normalized_answers_list_each_question_and_author_once(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    seed_answers(db, author=test_user2, user=test_user, count=4)
+    headers = auth_headers(test_user)
+    nested = client.get("/api/answers/me", headers=headers).json()
+
+    response = client.get("/api/answers/me?shape=normalized", headers=headers)
+    assert response.status_code == 200
+    normalized = response.json()
+    assert normalized["next_cursor"] is None
+    assert normalized["users"] == [nested[0]["question"]["author"]]
+    questions = {question["id"]: question for question in normalized["questions"]}
+    assert len(questions) == 4
+    for answer, full in zip(normalized["answers"], nested):
+        question = dict(full.pop("question"))
+        question.pop("author")
+        assert answer == full
+        assert questions[answer["question_id"]] == question
+
+    page = client.get("/api/answers/me?shape=normalized&cursor=&limit=3", headers=headers).json()
+    assert [a["id"] for a in page["answers"]] == [a["id"] for a in normalized["answers"][:3]]
+    assert page["next_cursor"] is not None
+    assert len(page["questions"]) == 3
+
+def test_shape_is_part_of_the_etag(client: TestClient, db: Session, test_user: dict, test_user2: dict):
+    create_question(db, author=test_user2, recipient=test_user, text="Pets?")
+    headers = auth_headers(test_user)
+    nested = client.get("/api/answers/me", headers=headers).headers["ETag"]
+    normalized = client.get("/api/answers/me?shape=normalized", headers=headers).headers["ETag"]
+    assert nested != normalized
+    assert client.get("/api/answers/me?shape=flat", headers=headers).status_code == 422
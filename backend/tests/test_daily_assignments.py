@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.models.answer import Answer
+from app.models.daily_assignment import DailyAssignment
+from app.models.question import Question
+from tests.conftest import auth_headers, create_question
+
+def days_ago(days: int) -> datetime:
+    return datetime.utcnow() - timedelta(days=days)
+
+def test_assign_all_picks_oldest_unanswered(db: Session, test_user: dict, test_user2: dict):
+    today = datetime.utcnow().date()
+    create_question(
+        db, author=test_user2, recipient=test_user, text="Asked 1 days ago", created_at=days_ago(1)
+    )
+    oldest = create_question(
+        db, author=test_user2, recipient=test_user, text="Asked 3 days ago", created_at=days_ago(3)
+    )
+    # test_user2 already submitted today's daily answer, so gets nothing
+    answered = create_question(
+        db, author=test_user, recipient=test_user2, text="Asked 2 days ago", created_at=days_ago(2)
+    )
+    create_question(
+        db, author=test_user, recipient=test_user2, text="Asked 1 days ago", created_at=days_ago(1)
+    )
+    db.add(Answer(
+        id=str(uuid4()), question_id=answered, user_id=test_user2["id"], text="Done",
+        answered_on=today
+    ))
+    db.commit()
+
+    assert crud.daily_assignment.assign_all(db, day=today) == 1
+    assert crud.daily_assignment.assign_all(db, day=today) == 0
+    rows = db.query(DailyAssignment).all()
+    assert [(r.user_id, r.date, r.question_id) for r in rows] == [
+        (UUID(test_user["id"]), today, UUID(oldest))
+    ]
+
+def test_daily_question_is_stable_for_the_day(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict, count_queries
+):
+    headers = auth_headers(test_user)
+    assigned = create_question(
+        db, author=test_user2, recipient=test_user, text="Asked 1 days ago", created_at=days_ago(1)
+    )
+    crud.daily_assignment.assign_all(db, day=datetime.utcnow().date())
+    # Older, but arrives after today's pick
+    create_question(
+        db, author=test_user2, recipient=test_user, text="Asked 5 days ago", created_at=days_ago(5)
+    )
+
+    response = client.get("/api/questions/daily", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == assigned
+    assert response.json()["author"]["email"] == test_user2["email"]
+
+    with count_queries() as statements:
+        response = client.get("/api/questions/daily", headers=headers)
+    assert response.json()["id"] == assigned
+    # The user comes from the cache; the ETag's version and the assignment
+    # are one keyed read each
+    assert len(statements) == 2
+    assert "user_stats" in statements[0]
+    assert "daily_assignments" in statements[1]
+
+def test_direct_answers_dont_use_up_the_daily_question(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    headers = auth_headers(test_user)
+    answered = create_question(
+        db, author=test_user2, recipient=test_user, text="Direct", created_at=days_ago(2)
+    )
+    daily = create_question(
+        db, author=test_user2, recipient=test_user, text="Daily", created_at=days_ago(1)
+    )
+    response = client.post(
+        "/api/answers/", headers=headers, json={"text": "Posted directly", "question_id": answered}
+    )
+    assert response.status_code == 200
+    # /answers/ doesn't flag the question; do it so only `daily` is eligible
+    db.query(Question).filter(Question.id == answered).update({"is_answered": True})
+    db.commit()
+
+    # Assigned on request (no job run yet)...
+    response = client.get("/api/questions/daily", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == daily
+
+    # ...and by the job, the same way
+    db.query(DailyAssignment).delete()
+    db.commit()
+    assert crud.daily_assignment.assign_all(db, day=datetime.utcnow().date()) == 1
+    response = client.get("/api/questions/daily", headers=headers)
+    assert response.json()["id"] == daily
+
+def test_answering_another_question_uses_up_the_assignment(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    headers = auth_headers(test_user)
+    create_question(
+        db, author=test_user2, recipient=test_user, text="Assigned", created_at=days_ago(2)
+    )
+    other = create_question(
+        db, author=test_user2, recipient=test_user, text="Other", created_at=days_ago(1)
+    )
+    crud.daily_assignment.assign_all(db, day=datetime.utcnow().date())
+
+    response = client.post(
+        f"/api/questions/daily/{other}/answer", headers=headers, json={"text": "This one"}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/questions/daily", headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "You have already answered today's question"
@@ -0,0 +1,72 @@
+import logging
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool, QueuePool
+from app.core.config import Settings
+from app.db.engine import create_db_engine, engine_options, log_pool_usage
+
+POSTGRES = "postgresql://u:p@db:5432/journal"
+ASYNCPG = "postgresql+asyncpg://u:p@db:5432/journal"
+
+def make_settings(**overrides) -> Settings:
+    return Settings(ENVIRONMENT="development", **overrides)
+
+def test_queue_pool_is_sized_from_settings():
+    options = engine_options(
+        POSTGRES,
+        make_settings(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2, DB_POOL_TIMEOUT=7, DB_POOL_RECYCLE=60),
+    )
+    assert options == {
+        "pool_size": 3,
+        "max_overflow": 2,
+        "pool_timeout": 7,
+        "pool_recycle": 60,
+        "pool_pre_ping": True,
+        "connect_args": {},
+    }
+    engine = create_db_engine(POSTGRES, config=make_settings(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2))
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+
+def test_null_mode_for_pgbouncer():
+    config = make_settings(DB_POOL_MODE="null")
+    assert engine_options(POSTGRES, config) == {"poolclass": NullPool, "connect_args": {}}
+    # asyncpg's prepared statements don't survive transaction pooling
+    assert engine_options(ASYNCPG, config)["connect_args"] == {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
+    assert isinstance(create_db_engine(POSTGRES, config=config).pool, NullPool)
+
+def test_production_requires_ssl_on_either_driver():
+    config = Settings(ENVIRONMENT="production")
+    assert engine_options(POSTGRES, config)["connect_args"] == {"sslmode": "require"}
+    assert engine_options(ASYNCPG, config)["connect_args"] == {"ssl": "require"}
+
+def test_sqlite_keeps_its_default_pool():
+    assert engine_options("sqlite:///./x.db", make_settings()) == {}
+    assert engine_options("sqlite:///./x.db", make_settings(DB_POOL_MODE="null")) == {
+        "poolclass": NullPool
+    }
+
+def test_unknown_pool_mode_is_an_error():
+    with pytest.raises(ValueError):
+        engine_options(POSTGRES, make_settings(DB_POOL_MODE="pgbouncer"))
+
+def test_pool_usage_is_logged(tmp_path, caplog):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}", name="probe")
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("select 1"))
+        second.execute(text("select 1"))
+    with engine.connect() as conn:
+        conn.execute(text("select 1"))
+
+    with caplog.at_level(logging.INFO, logger="app.db.engine"):
+        log_pool_usage()
+    [record] = [r for r in caplog.records if getattr(r, "engine", None) == "probe"]
+    assert record.checkouts == 3
+    assert record.peak_checked_out == 2
+    assert record.checked_out == 0
+    assert record.connects == 2
+    engine.dispose()
@@ -0,0 +1,78 @@
+import asyncio
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from tests.conftest import TestingAsyncSessionLocal
+from tests.conftest import auth_headers, create_question
+
+def answer_questions(client: TestClient, db: Session, author: dict, user: dict, count: int) -> list:
+    texts = []
+    for i in range(count):
+        question_id = create_question(db, author=author, recipient=user, text=f"Question {i}")
+        response = client.post(
+            "/api/answers/",
+            headers=auth_headers(user),
+            json={"text": f"Answer {i}", "question_id": question_id}
+        )
+        assert response.status_code == 200
+        texts.append(f"Answer {i}")
+    return texts
+
+def test_export_ndjson(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict, monkeypatch
+):
+    texts = answer_questions(client, db, test_user2, test_user, 5)
+    answer_questions(client, db, test_user, test_user2, 1)
+
+    # Force several cursor batches
+    stream = crud.answer.stream_by_user_async
+    monkeypatch.setattr(
+        crud.answer, "stream_by_user_async",
+        lambda db, *, user_id: stream(db, user_id=user_id, batch_size=2)
+    )
+    response = client.get("/api/answers/me/export", headers=auth_headers(test_user))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "attachment" in response.headers["content-disposition"]
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["text"] for line in lines] == texts
+    assert lines[0]["question"]["text"] == "Question 0"
+    assert lines[0]["question"]["author"]["email"] == test_user2["email"]
+
+def test_export_csv(client: TestClient, db: Session, test_user: dict, test_user2: dict):
+    texts = answer_questions(client, db, test_user2, test_user, 3)
+
+    response = client.get("/api/answers/me/export?format=csv", headers=auth_headers(test_user))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["answer"] for row in rows] == texts
+    assert rows[0]["question"] == "Question 0"
+    assert rows[0]["asked_by"] == test_user2["full_name"]
+
+def test_export_rejects_unknown_format(client: TestClient, test_user: dict):
+    response = client.get("/api/answers/me/export?format=xml", headers=auth_headers(test_user))
+    assert response.status_code == 422
+
+def test_stream_reads_past_the_first_batch(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    texts = answer_questions(client, db, test_user2, test_user, 5)
+
+    async def collect():
+        async with TestingAsyncSessionLocal() as session:
+            return [
+                [answer.text for answer in batch]
+                async for batch in crud.answer.stream_by_user_async(
+                    session, user_id=test_user["id"], batch_size=2
+                )
+            ]
+
+    batches = asyncio.run(collect())
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert sum(batches, []) == texts
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.http_cache import make_etag
+from tests.conftest import auth_headers, create_question, run_jobs, seed_answers
+
+def revalidate(client: TestClient, url: str, headers: dict, etag: str):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+def test_answers_me_revalidates_with_one_query(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict, count_queries
+):
+    seed_answers(db, author=test_user2, user=test_user, count=3)
+    headers = auth_headers(test_user)
+
+    response = client.get("/api/answers/me", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    # The listing is big enough to be compressed, which adds its own Vary
+    assert response.headers["Vary"] == "Authorization, Accept-Encoding"
+
+    with count_queries() as statements:
+        response = revalidate(client, "/api/answers/me", headers, etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    # Only the version read; no listing, no serialization
+    assert len(statements) == 1
+    assert "user_stats" in statements[0]
+
+    # Other query strings are other representations
+    response = revalidate(client, "/api/answers/me?limit=1", headers, etag)
+    assert response.status_code == 200
+
+def test_answering_changes_the_etags(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    question_id = create_question(db, author=test_user2, recipient=test_user, text="Pets?")
+    headers = auth_headers(test_user)
+    urls = ("/api/answers/me", "/api/users/me/stats", "/api/questions/daily")
+    etags = {url: client.get(url, headers=headers).headers["ETag"] for url in urls}
+
+    response = client.post(
+        f"/api/questions/daily/{question_id}/answer", headers=headers, json={"text": "A cat"}
+    )
+    assert response.status_code == 200
+
+    for url in ("/api/answers/me", "/api/users/me/stats"):
+        response = revalidate(client, url, headers, etags[url])
+        assert response.status_code == 200, url
+        assert response.headers["ETag"] != etags[url]
+    # Today's question is gone, so there's nothing to revalidate against
+    response = revalidate(client, "/api/questions/daily", headers, etags["/api/questions/daily"])
+    assert response.status_code == 404
+
+def test_editing_an_answer_changes_the_etag(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    seed_answers(db, author=test_user2, user=test_user, count=1)
+    headers = auth_headers(test_user)
+    response = client.get("/api/answers/me", headers=headers)
+    etag = response.headers["ETag"]
+
+    answer_id = response.json()[0]["id"]
+    response = client.put(f"/api/answers/{answer_id}", headers=headers, json={"text": "Edited"})
+    assert response.status_code == 200
+
+    response = revalidate(client, "/api/answers/me", headers, etag)
+    assert response.status_code == 200
+    assert response.json()[0]["text"] == "Edited"
+
+def test_receiving_a_question_changes_the_recipients_etags(
+    client: TestClient, test_user: dict, test_user2: dict
+):
+    headers = auth_headers(test_user)
+    etag = client.get("/api/users/me/stats", headers=headers).headers["ETag"]
+
+    response = client.post(
+        "/api/questions/bulk",
+        headers=auth_headers(test_user2),
+        json={"text": "Favourite song?", "recipient_ids": [test_user["id"]]},
+    )
+    assert response.status_code == 200
+    run_jobs()
+
+    response = revalidate(client, "/api/users/me/stats", headers, etag)
+    assert response.status_code == 200
+    assert response.json()["top_received"][0]["count"] == 1
+
+def test_daily_question_etag_is_per_day(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    create_question(db, author=test_user2, recipient=test_user, text="Pets?")
+    headers = auth_headers(test_user)
+    response = client.get("/api/questions/daily", headers=headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert revalidate(client, "/api/questions/daily", headers, etag).status_code == 304
+
+    # Same version tomorrow is a different tag
+    today = datetime.utcnow().date()
+    assert etag == make_etag("daily", test_user["id"], 0, today)
+    assert etag != make_etag("daily", test_user["id"], 0, today + timedelta(days=1))
+
+def test_users_listing_if_modified_since(client: TestClient, test_user: dict, test_user2: dict):
+    headers = auth_headers(test_user)
+    response = client.get("/api/users/", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "private, max-age=60"
+    last_modified = response.headers["Last-Modified"]
+
+    response = client.get("/api/users/", headers={**headers, "If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    older = format_datetime(datetime(2000, 1, 1), usegmt=False)
+    response = client.get("/api/users/", headers={**headers, "If-Modified-Since": older})
+    assert response.status_code == 200
+
+    etag = client.get("/api/users/", headers=headers).headers["ETag"]
+    assert revalidate(client, "/api/users/", headers, f'"other", {etag}').status_code == 304
+    assert revalidate(client, "/api/users/", headers, '"other"').status_code == 200
+
+def test_users_listing_changes_with_any_user_write(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    headers = auth_headers(test_user)
+    etag = client.get("/api/users/", headers=headers).headers["ETag"]
+    other = crud.user.get(db, id=test_user2["id"])
+
+    for change in ({"full_name": "Renamed"}, {"is_active": False}):
+        crud.user.update(db, db_obj=other, obj_in=change)
+        response = revalidate(client, "/api/users/", headers, etag)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+    crud.user.remove(db, id=test_user2["id"])
+    assert revalidate(client, "/api/users/", headers, etag).status_code == 200
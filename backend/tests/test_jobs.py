@@ -0,0 +1,157 @@
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.jobs import queue
+from app.jobs.queue import JobWorker, enqueue, handlers, retry_delay
+from app.models.outbox_job import OutboxJob
+from app.models.user_stats import UserStats
+from tests.conftest import TestingAsyncSessionLocal, TestingSessionLocal, auth_headers, run_jobs
+
+def enqueue_and(finish: str, kind: str = "test.job", **payload) -> None:
+    """Enqueue a job on a fresh session, then "commit" or "rollback" it."""
+    async def go():
+        async with TestingAsyncSessionLocal() as db:
+            enqueue(db, kind, **payload)
+            await getattr(db, finish)()
+    asyncio.run(go())
+
+@pytest.fixture
+def wakeups(monkeypatch):
+    """Stand in for the process's worker and count its wake-ups."""
+    calls = []
+
+    class Worker:
+        def wake(self):
+            calls.append(1)
+
+    monkeypatch.setattr(queue, "_worker", Worker())
+    return calls
+
+@pytest.fixture
+def handled(monkeypatch):
+    """Register a "test.job" handler that records payloads, or raises when told to."""
+    payloads = []
+
+    async def handler(db, payload):
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+        payloads.append(payload)
+
+    monkeypatch.setitem(handlers, "test.job", handler)
+    return payloads
+
+def test_enqueued_job_runs_after_commit(db: Session, wakeups, handled):
+    enqueue_and("commit", n=1)
+    assert wakeups == [1]
+    assert db.query(OutboxJob).count() == 1
+
+    assert run_jobs() == 1
+    assert handled == [{"n": 1}]
+    assert db.query(OutboxJob).count() == 0
+
+def test_rolled_back_job_never_exists(db: Session, wakeups, handled):
+    enqueue_and("rollback", n=1)
+    assert wakeups == []
+    assert db.query(OutboxJob).count() == 0
+    assert run_jobs() == 0
+
+def test_retry_delay_doubles_up_to_the_cap():
+    assert [retry_delay(n) for n in (1, 2, 3)] == [
+        settings.JOBS_RETRY_BASE_SECONDS * factor for factor in (1, 2, 4)
+    ]
+    assert retry_delay(100) == settings.JOBS_RETRY_MAX_SECONDS
+
+def test_failed_job_is_retried_with_backoff(db: Session, handled):
+    enqueue_and("commit", fail=True)
+    before = datetime.utcnow()
+    assert run_jobs() == 0
+
+    job = db.query(OutboxJob).one()
+    assert job.attempts == 1
+    assert job.lease_id is None
+    assert "boom" in job.last_error
+    assert (job.available_at - before).total_seconds() >= retry_delay(1)
+    # Not due yet
+    assert run_jobs() == 0
+    db.expire_all()
+    assert db.query(OutboxJob).one().attempts == 1
+
+    job.available_at = datetime.utcnow()
+    db.commit()
+    assert run_jobs() == 0
+    db.expire_all()
+    assert db.query(OutboxJob).one().attempts == 2
+
+def test_job_is_abandoned_after_max_attempts(db: Session, handled):
+    enqueue_and("commit", fail=True)
+    job = db.query(OutboxJob).one()
+    job.attempts = settings.JOBS_MAX_ATTEMPTS - 1
+    db.commit()
+
+    assert run_jobs() == 0
+    db.expire_all()
+    job = db.query(OutboxJob).one()
+    assert job.attempts == settings.JOBS_MAX_ATTEMPTS
+    # Kept for inspection, but never claimed again
+    job.available_at = datetime.utcnow()
+    db.commit()
+    assert run_jobs() == 0
+    db.expire_all()
+    assert db.query(OutboxJob).one().attempts == settings.JOBS_MAX_ATTEMPTS
+
+def test_unknown_kind_fails_like_any_error(db: Session):
+    enqueue_and("commit", kind="test.nobody")
+    assert run_jobs() == 0
+    assert "no handler" in db.query(OutboxJob).one().last_error
+
+def test_run_with_a_lost_lease_is_rolled_back(
+    db: Session, test_user: dict, monkeypatch
+):
+    async def handler(db, payload):
+        # Another worker re-leases the job while this run is still going
+        with TestingSessionLocal() as other:
+            other.query(OutboxJob).update({"lease_id": uuid4()})
+            other.commit()
+        await crud.user_stats.touch_async(db, user_id=test_user["id"])
+
+    monkeypatch.setitem(handlers, "test.job", handler)
+    enqueue_and("commit")
+    assert run_jobs() == 0
+    # The job is left to its new owner, and this run's write undone
+    assert db.query(OutboxJob).count() == 1
+    assert db.query(UserStats).count() == 0
+
+def test_claim_skips_rows_locked_by_other_workers():
+    stmt = JobWorker(TestingAsyncSessionLocal)._claim_statement(datetime.utcnow(), uuid4())
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "RETURNING" in sql
+
+def test_pair_counts_job_refreshes_cached_stats(
+    client: TestClient, test_user: dict, test_user2: dict
+):
+    response = client.post(
+        "/api/questions/bulk",
+        headers=auth_headers(test_user),
+        json={"text": "Favourite song?", "recipient_ids": [test_user2["id"]]},
+    )
+    assert response.status_code == 200
+    headers = auth_headers(test_user2)
+    response = client.get("/api/users/me/stats", headers=headers)
+    assert response.json()["questions_asked"] == 0
+    assert response.json()["top_received"] == []
+
+    assert run_jobs() == 1
+    response = client.get(
+        "/api/users/me/stats", headers={**headers, "If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["top_received"] == [
+        {"user_id": test_user["id"], "name": test_user["full_name"], "count": 1}
+    ]
@@ -0,0 +1,25 @@
+import json
+import logging
+from app.core.logging import JSONFormatter, parse_log_levels
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.makeLogRecord({
+        "name": "app.api.answers",
+        "levelno": logging.INFO,
+        "levelname": "INFO",
+        "msg": "Answered question %s",
+        "args": ("q1",),
+        "user_id": "u1",
+    })
+    payload = json.loads(JSONFormatter().format(record))
+    assert payload["message"] == "Answered question q1"
+    assert payload["logger"] == "app.api.answers"
+    assert payload["level"] == "INFO"
+    assert payload["user_id"] == "u1"
+
+def test_parse_log_levels():
+    assert parse_log_levels("app.api=debug, sqlalchemy.engine=INFO,") == {
+        "app.api": "DEBUG",
+        "sqlalchemy.engine": "INFO",
+    }
+    assert parse_log_levels("") == {}
@@ -0,0 +1,44 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.metrics import instrument_engine, registry
+from tests.conftest import test_async_engine, test_engine
+from tests.conftest import auth_headers
+
+def sample(name: str, **labels) -> float:
+    return registry.get_sample_value(name, labels) or 0.0
+
+def test_request_metrics_by_route(client: TestClient, test_user: dict):
+    instrument_engine(test_engine)
+    instrument_engine(test_async_engine.sync_engine)
+    labels = {"method": "GET", "route": "/api/questions/received"}
+    requests_before = sample("http_request_duration_seconds_count", status="200", **labels)
+    queries_before = sample("http_request_db_queries_sum", **labels)
+
+    response = client.get("/api/questions/received", headers=auth_headers(test_user))
+    assert response.status_code == 200
+
+    assert sample("http_request_duration_seconds_count", status="200", **labels) == requests_before + 1
+    # User lookup plus the listing itself
+    assert sample("http_request_db_queries_sum", **labels) - queries_before >= 2
+
+def test_metrics_endpoint(client: TestClient):
+    client.get("/does-not-exist")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in body
+    assert "db_pool_checked_out" in body
+
+def test_metrics_endpoint_is_closed_outside_development(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    assert client.get("/metrics").status_code == 404
+
+def test_metrics_endpoint_takes_a_bearer_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-me")
+    response = client.get("/metrics")
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-me"}).status_code == 200
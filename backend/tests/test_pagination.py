@@ -0,0 +1,79 @@
+from datetime import datetime
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from tests.conftest import auth_headers, seed_answers
+
+def test_cursor_round_trip():
+    created_at = datetime(2025, 3, 4, 5, 6, 7, 891011)
+    id = str(uuid4())
+    cursor = decode_cursor(encode_cursor(created_at, id))
+    assert cursor.created_at == created_at
+    assert cursor.id == id
+
+def test_answers_keyset_pages_match_offset(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    seed_answers(db, author=test_user2, user=test_user, count=7)
+    headers = auth_headers(test_user)
+
+    offset_ids = [a["id"] for a in client.get("/api/answers/me", headers=headers).json()]
+    assert len(offset_ids) == 7
+
+    keyset_ids = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(
+            "/api/answers/me", headers=headers, params={"cursor": cursor, "limit": 3}
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 3
+        keyset_ids += [a["id"] for a in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert keyset_ids == offset_ids
+
+def test_received_questions_keyset(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    seed_answers(db, author=test_user2, user=test_user, count=4)
+    headers = auth_headers(test_user)
+
+    first = client.get(
+        "/api/questions/received", headers=headers, params={"cursor": "", "limit": 3}
+    ).json()
+    assert len(first["items"]) == 3
+    second = client.get(
+        "/api/questions/received", headers=headers,
+        params={"cursor": first["next_cursor"], "limit": 3}
+    ).json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+def test_invalid_cursor(client: TestClient, test_user: dict):
+    response = client.get(
+        "/api/answers/me", headers=auth_headers(test_user), params={"cursor": "nope"}
+    )
+    assert response.status_code == 400
+    # Well-formed, but the id isn't a key
+    response = client.get(
+        "/api/answers/me", headers=auth_headers(test_user),
+        params={"cursor": encode_cursor(datetime(2025, 1, 1), "abc")}
+    )
+    assert response.status_code == 400
+
+def test_page_size_is_bounded(client: TestClient, db: Session, test_user: dict, test_user2: dict):
+    seed_answers(db, author=test_user2, user=test_user, count=2)
+    headers = auth_headers(test_user)
+    for url in ("/api/answers/me", "/api/questions/received", "/api/questions/sent",
+                "/api/questions/", "/api/users/"):
+        for limit in (0, -1, MAX_PAGE_SIZE + 1):
+            response = client.get(url, headers=headers, params={"cursor": "", "limit": limit})
+            assert response.status_code == 422, (url, limit)
+
+def test_empty_page_has_no_cursor():
+    assert crud.answer._page_result([], 0) == ([], None)
+    assert crud.answer._page_result([object()], -1) == ([], None)
@@ -0,0 +1,41 @@
+import asyncio
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core import security
+from app.core.config import settings
+from app.models.user import User
+
+def test_hash_and_verify_in_pool(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    try:
+        hashed = asyncio.run(security.get_password_hash_async("s3cret"))
+        assert hashed.startswith("$2b$04$")
+        assert asyncio.run(security.verify_and_update_password_async("s3cret", hashed)) == (True, None)
+        assert asyncio.run(security.verify_and_update_password_async("wrong", hashed)) == (False, None)
+    finally:
+        security.shutdown_password_hasher()
+
+def test_login_rehashes_outdated_cost(
+    monkeypatch, client: TestClient, db: Session, test_user: dict
+):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    response = client.post(
+        "/api/token",
+        data={"username": test_user["email"], "password": test_user["password"]},
+    )
+    assert response.status_code == 200
+
+    db.expire_all()
+    user = db.query(User).filter(User.email == test_user["email"]).one()
+    assert user.hashed_password.startswith("$2b$04$")
+    assert security.verify_password(test_user["password"], user.hashed_password)
+
+def test_register_sheds_load_when_hasher_is_full(monkeypatch, client: TestClient):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+    response = client.post(
+        "/api/register",
+        json={"email": "busy@example.com", "password": "pw123456", "full_name": "Busy"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,74 @@
+from typing import List
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from app.core.responses import shape_rows
+from app.models.answer import Answer as AnswerModel
+from app.models.question import Question as QuestionModel
+from app.schemas.answer import Answer
+from app.schemas.question import Question
+from tests.conftest import auth_headers, create_question, seed_answers
+
+def as_schema_json(schema, objects) -> list:
+    """What the response_model path would have sent for `objects`."""
+    return TypeAdapter(List[schema]).dump_python(
+        TypeAdapter(List[schema]).validate_python(objects, from_attributes=True), mode="json"
+    )
+
+def test_shape_rows_nests_labels_and_drops_missing_joins():
+    keys = ["id", "question__id", "question__author__id", "question__author__email"]
+    rows = [(1, 2, 3, "a@example.com"), (4, 5, None, None), (6, None, None, None)]
+    assert shape_rows(keys, rows) == [
+        {"id": 1, "question": {"id": 2, "author": {"id": 3, "email": "a@example.com"}}},
+        {"id": 4, "question": {"id": 5, "author": None}},
+        {"id": 6, "question": None},
+    ]
+
+def test_answers_me_matches_the_schema_output(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    seed_answers(db, author=test_user2, user=test_user, count=5)
+    headers = auth_headers(test_user)
+    answers = db.scalars(
+        select(AnswerModel)
+        .options(joinedload(AnswerModel.question).joinedload(QuestionModel.author))
+        .order_by(AnswerModel.created_at.desc(), AnswerModel.id.desc())
+    ).all()
+    expected = as_schema_json(Answer, answers)
+
+    response = client.get("/api/answers/me", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "ETag" in response.headers
+    assert response.json() == expected
+
+    first = client.get("/api/answers/me?cursor=&limit=3", headers=headers).json()
+    rest = client.get(
+        f"/api/answers/me?cursor={first['next_cursor']}&limit=3", headers=headers
+    ).json()
+    assert first["items"] + rest["items"] == expected
+    assert rest["next_cursor"] is None
+
+def test_received_questions_match_the_schema_output(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    for text in ("Pets?", "Travel?", "Books?"):
+        create_question(db, author=test_user2, recipient=test_user, text=text)
+    headers = auth_headers(test_user)
+    questions = db.scalars(
+        select(QuestionModel)
+        .options(joinedload(QuestionModel.author))
+        .where(QuestionModel.recipient_id == test_user["id"])
+        .order_by(QuestionModel.created_at.desc(), QuestionModel.id.desc())
+    ).all()
+    expected = as_schema_json(Question, questions)
+
+    response = client.get("/api/questions/received", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == expected
+    assert response.json()[0]["author"]["email"] == test_user2["email"]
+
+    page = client.get("/api/questions/received?cursor=&limit=2", headers=headers).json()
+    assert page["items"] == expected[:2]
+    assert page["next_cursor"] is not None
@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from tests.conftest import auth_headers, seed_answers
+
+def queries_for(client: TestClient, count_queries, url: str, headers: dict) -> int:
+    with count_queries() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return len(statements)
+
+def test_listing_answers_is_constant_in_rows(
+    client: TestClient, db: Session, count_queries, test_user: dict, test_user2: dict
+):
+    headers = auth_headers(test_user)
+    # Warm the user cache so only the listing itself is measured
+    client.get("/api/users/me", headers=headers)
+
+    seed_answers(db, author=test_user2, user=test_user, count=2)
+    few = {
+        url: queries_for(client, count_queries, url, headers)
+        for url in ("/api/answers/me", "/api/answers/me/past", "/api/questions/received")
+    }
+
+    seed_answers(db, author=test_user2, user=test_user, count=20)
+    for url, expected in few.items():
+        assert queries_for(client, count_queries, url, headers) == expected, url
+
+    # Answers, their questions and the authors come back in one SELECT,
+    # after the keyed version read behind the ETag
+    assert few["/api/answers/me"] == 2
+    assert few["/api/questions/received"] == 1
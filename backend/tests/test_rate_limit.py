@@ -0,0 +1,173 @@
+import asyncio
+import math
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from app import crud
+from app.api.deps import client_ip
+from app.core.config import settings
+from app.core.rate_limit import (
+    _TOKEN_BUCKET_LUA, MemoryRateLimitStore, RateLimit, RedisRateLimitStore,
+    parse_rate_limits, rate_limits,
+)
+from tests.conftest import auth_headers
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Set a limit for the duration of one test: limits("auth.token", 2, 60)."""
+    def set_limit(name: str, capacity: int, period: float) -> None:
+        monkeypatch.setitem(rate_limits, name, RateLimit(capacity, period))
+    return set_limit
+
+def test_parse_rate_limits():
+    limits = parse_rate_limits("auth.token=10/60, questions.bulk=5/3600")
+    assert limits["auth.token"].capacity == 10
+    assert limits["auth.token"].rate == pytest.approx(10 / 60)
+    assert limits["questions.bulk"].period == 3600
+
+def test_memory_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: now[0])
+    store = MemoryRateLimitStore()
+    limit = RateLimit(2, 10)  # one token every 5s
+
+    take = lambda key: asyncio.run(store.take(key, limit))
+    assert take("a") == 0
+    assert take("a") == 0
+    assert take("a") == pytest.approx(5)
+    assert take("b") == 0  # buckets are per key
+    now[0] += 5
+    assert take("a") == 0
+    assert take("a") == pytest.approx(5)
+
+def test_memory_store_is_bounded():
+    store = MemoryRateLimitStore(max_keys=2)
+    for key in ("a", "b", "c"):
+        asyncio.run(store.take(key, RateLimit(1, 60)))
+    assert list(store._buckets) == ["b", "c"]
+
+class FakeRedis:
+    """
+    The commands the token-bucket script uses, on a clock the test sets.
+    There's no Lua here, so register_script returns a line-for-line
+    transcription of _TOKEN_BUCKET_LUA run against them.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.hashes = {}
+        self.ttls = {}
+        self.scripts = []
+
+    def time(self):
+        seconds = int(self.now)
+        return seconds, round((self.now - seconds) * 1000000)
+
+    def hmget(self, key, *fields):
+        values = self.hashes.get(key, {})
+        return [values.get(field) for field in fields]
+
+    def hset(self, key, mapping):
+        # Redis keeps every field as a string
+        self.hashes.setdefault(key, {}).update({k: str(v).encode() for k, v in mapping.items()})
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def register_script(self, source):
+        self.scripts.append(source)
+
+        async def token_bucket(keys, args):
+            capacity, rate = float(args[0]), float(args[1])
+            clock = self.time()
+            now = clock[0] + clock[1] / 1000000
+            bucket = self.hmget(keys[0], "tokens", "ts")
+            tokens = float(bucket[0]) if bucket[0] is not None else capacity
+            ts = float(bucket[1]) if bucket[1] is not None else now
+            tokens = min(capacity, tokens + max(0, now - ts) * rate)
+            wait = 0
+            if tokens >= 1:
+                tokens = tokens - 1
+            else:
+                wait = (1 - tokens) / rate
+            self.hset(keys[0], {"tokens": tokens, "ts": now})
+            self.expire(keys[0], math.ceil(capacity / rate) + 1)
+            return str(wait).encode()
+
+        return token_bucket
+
+def test_redis_bucket_refills_over_time():
+    redis = FakeRedis()
+    store = RedisRateLimitStore(client=redis)
+    assert redis.scripts == [_TOKEN_BUCKET_LUA]
+    limit = RateLimit(2, 10)  # one token every 5s
+
+    take = lambda key: asyncio.run(store.take(key, limit))
+    assert take("a") == 0
+    assert take("a") == 0
+    assert take("a") == pytest.approx(5)
+    assert take("b") == 0
+    redis.now += 2.5
+    assert take("a") == pytest.approx(2.5)
+    redis.now += 2.5
+    assert take("a") == 0
+    assert take("a") == pytest.approx(5)
+
+    assert set(redis.hashes) == {"ratelimit:a", "ratelimit:b"}
+    # Idle buckets expire once they'd be full again anyway
+    assert redis.ttls["ratelimit:a"] == 11
+
+def test_login_is_limited_per_ip_before_hashing(
+    client: TestClient, test_user: dict, limits, monkeypatch
+):
+    limits("auth.token", 2, 60)
+    calls = []
+    real_authenticate = crud.user.authenticate_async
+
+    async def counting_authenticate(*args, **kwargs):
+        calls.append(1)
+        return await real_authenticate(*args, **kwargs)
+
+    monkeypatch.setattr(crud.user, "authenticate_async", counting_authenticate)
+    form = {"username": test_user["email"], "password": "wrong"}
+    for _ in range(2):
+        assert client.post("/api/token", data=form).status_code == 401
+
+    response = client.post("/api/token", data=form)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+    # Rejected before the password was checked
+    assert len(calls) == 2
+
+def test_question_creation_is_limited_per_user(
+    client: TestClient, test_user: dict, test_user2: dict, limits
+):
+    limits("questions.create", 1, 60)
+    url = "/api/questions/user-question/{}"
+    body = {"text": "Pets?"}
+    first = client.post(url.format(test_user2["id"]), headers=auth_headers(test_user), json=body)
+    assert first.status_code == 200
+    again = client.post(url.format(test_user2["id"]), headers=auth_headers(test_user), json=body)
+    assert again.status_code == 429
+    assert again.headers["Retry-After"] == "60"
+
+    other = client.post(url.format(test_user["id"]), headers=auth_headers(test_user2), json=body)
+    assert other.status_code == 200
+
+def test_limits_can_be_switched_off(client: TestClient, test_user: dict, limits, monkeypatch):
+    limits("auth.token", 1, 60)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    form = {"username": test_user["email"], "password": "wrong"}
+    for _ in range(3):
+        assert client.post("/api/token", data=form).status_code == 401
+
+def make_request(peer: str, forwarded: str = "") -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+def test_client_ip_only_trusts_configured_proxies(monkeypatch):
+    spoofed = make_request("10.0.0.1", "6.6.6.6, 203.0.113.7")
+    assert client_ip(spoofed) == "10.0.0.1"
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+    assert client_ip(spoofed) == "203.0.113.7"
+    assert client_ip(make_request("10.0.0.1")) == "10.0.0.1"
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.pagination import SearchCursor, decode_search_cursor, encode_search_cursor
+from app.core.search import InvertedIndex, tokenize
+from app.models.answer import Answer as AnswerModel
+from app.models.question import Question as QuestionModel
+from tests.conftest import auth_headers, create_question
+
+def add_answer(db: Session, *, user: dict, author: dict, text: str, created_at: datetime) -> str:
+    question_id = create_question(
+        db, author=author, recipient=user, text="Prompt", created_at=created_at
+    )
+    answer_id = str(uuid4())
+    db.add(AnswerModel(
+        id=answer_id,
+        text=text,
+        question_id=question_id,
+        user_id=user["id"],
+        created_at=created_at,
+        updated_at=created_at
+    ))
+    db.commit()
+    return answer_id
+
+def test_tokenize_drops_stop_words_and_stems():
+    assert tokenize("The cats were chasing the mice!") == ["cat", "chas", "mice"]
+    assert tokenize("Sisters' classes") == ["sister", "class"]
+
+def test_inverted_index_matches_every_term():
+    index = InvertedIndex.build([
+        (1, "a walk by the sea"),
+        (2, "the sea, the sea, the sea"),
+        (3, "a walk in the park"),
+    ])
+    assert set(index.search("sea")) == {1, 2}
+    assert set(index.search("walk sea")) == {1}
+    assert index.search("mountains") == {}
+    assert index.search("the") == {}
+    scores = index.search("sea")
+    assert scores[2] > scores[1]
+
+def test_search_cursor_round_trip():
+    cursor = SearchCursor(0.0607927, datetime(2025, 3, 4, 5, 6, 7, 891011), str(uuid4()))
+    assert decode_search_cursor(encode_search_cursor(*cursor)) == cursor
+    with pytest.raises(ValueError):
+        decode_search_cursor(encode_search_cursor(0.5, datetime(2025, 1, 1), "abc"))
+
+def test_search_answers(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    base = datetime(2025, 1, 1)
+    once = add_answer(db, user=test_user, author=test_user2, text="I went to the sea", created_at=base)
+    often = add_answer(
+        db, user=test_user, author=test_user2,
+        text="Sea air, sea salt, the sea again", created_at=base + timedelta(days=1)
+    )
+    add_answer(db, user=test_user, author=test_user2, text="A quiet day in", created_at=base)
+    # Someone else's journal never shows up
+    add_answer(db, user=test_user2, author=test_user, text="The sea was rough", created_at=base)
+
+    response = client.get(
+        "/api/answers/search", headers=auth_headers(test_user), params={"q": "seas"}
+    )
+    assert response.status_code == 200
+    page = response.json()
+    assert [a["id"] for a in page["items"]] == [often, once]
+    assert page["items"][0]["question"]["author"]["email"] == test_user2["email"]
+    assert page["next_cursor"] is None
+
+def test_search_answers_pages_by_cursor(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    base = datetime(2025, 1, 1)
+    # Equal ranks, so pages fall back to newest first; two share a timestamp
+    ids = [
+        add_answer(
+            db, user=test_user, author=test_user2, text=f"Garden notes {i}",
+            created_at=base + timedelta(days=i // 2)
+        )
+        for i in range(5)
+    ]
+    headers = auth_headers(test_user)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "garden", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/answers/search", headers=headers, params=params).json()
+        assert len(page["items"]) <= 2
+        seen += [a["id"] for a in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(ids)
+    assert len(seen) == len(set(seen))
+
+def test_search_questions_covers_received_and_sent(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict, test_superuser: dict
+):
+    received = create_question(db, author=test_user2, recipient=test_user, text="Favourite book?")
+    sent = create_question(db, author=test_user, recipient=test_user2, text="Which books shaped you?")
+    create_question(db, author=test_user2, recipient=test_superuser, text="Best book this year?")
+
+    response = client.get(
+        "/api/questions/search", headers=auth_headers(test_user), params={"q": "book"}
+    )
+    assert response.status_code == 200
+    assert {q["id"] for q in response.json()["items"]} == {received, sent}
+
+def test_search_rejects_bad_input(client: TestClient, test_user: dict):
+    headers = auth_headers(test_user)
+    response = client.get("/api/answers/search", headers=headers, params={"q": ""})
+    assert response.status_code == 422
+    response = client.get(
+        "/api/answers/search", headers=headers, params={"q": "sea", "cursor": "nope"}
+    )
+    assert response.status_code == 400
+
+def test_postgres_search_uses_the_generated_column():
+    after = SearchCursor(0.5, datetime(2025, 1, 1), "abc")
+    statement = crud.answer._search_statement(
+        query="sea", after=after, limit=20, where=[AnswerModel.user_id == "u"]
+    )
+    sql = " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+    assert "answers.search_vector @@ plainto_tsquery(" in sql
+    assert "ORDER BY ts_rank(answers.search_vector, plainto_tsquery(" in sql
+    assert "(ts_rank(answers.search_vector" in sql and ") < (" in sql
+
+def test_search_vector_is_postgres_only():
+    for model in (AnswerModel, QuestionModel):
+        column = model.__table__.c.search_vector
+        assert column.system
+        assert "search_vector" not in model.__mapper__.columns
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+from typing import Dict, Generator
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from tests.conftest import auth_headers, seed_answers, test_async_engine, test_engine
+
+@contextmanager
+def track_checkouts() -> Generator[Dict[str, int], None, None]:
+    """Checkouts per engine, and the most held at once across both."""
+    usage = {"sync": 0, "async": 0, "held": 0, "peak": 0}
+    engines = {"sync": test_engine, "async": test_async_engine.sync_engine}
+    listeners = []
+    for name, engine in engines.items():
+        def checkout(*args, name=name):
+            usage[name] += 1
+            usage["held"] += 1
+            usage["peak"] = max(usage["peak"], usage["held"])
+
+        def checkin(*args):
+            usage["held"] -= 1
+
+        listeners += [(engine, "checkout", checkout), (engine, "checkin", checkin)]
+    for listener in listeners:
+        event.listen(*listener)
+    try:
+        yield usage
+    finally:
+        for listener in listeners:
+            event.remove(*listener)
+
+def test_user_and_handler_share_one_connection(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict
+):
+    seed_answers(db, author=test_user2, user=test_user, count=3)
+    headers = auth_headers(test_user)
+    for url in ("/api/answers/me", "/api/users/me/stats", "/api/questions/received"):
+        with track_checkouts() as usage:
+            response = client.get(url, headers=headers)
+        assert response.status_code == 200, url
+        # The user lookup and the handler's queries run on one checkout
+        assert usage == {"sync": 0, "async": 1, "held": 0, "peak": 1}, url
+
+def test_cached_user_request_checks_out_nothing(client: TestClient, test_user: dict):
+    headers = auth_headers(test_user)
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    with track_checkouts() as usage:
+        response = client.get("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    assert usage["sync"] == usage["async"] == 0
@@ -0,0 +1,35 @@
+from pathlib import Path
+from startup_benchmark import METRICS, find_regressions, measure_once, summarize
+
+def test_startup_benchmark_smoke(tmp_path: Path):
+    from sqlalchemy import create_engine
+    from app.db.base import Base
+
+    database_url = f"sqlite:///{tmp_path / 'startup.db'}"
+    Base.metadata.create_all(bind=create_engine(database_url))
+
+    run = measure_once("main:app", database_url)
+    assert set(run) == set(METRICS)
+    assert 0 < run["import_ms"] < run["process_ms"]
+
+    summary = summarize([run, run])
+    assert summary["import_ms"]["median"] == run["import_ms"]
+    slower = {metric: dict(s, median=s["median"] * 2) for metric, s in summary.items()}
+    assert find_regressions(summary, summary, 0.2) == []
+    assert len(find_regressions(slower, summary, 0.2)) == len(METRICS)
+
+def test_app_import_leaves_optional_modules_unloaded():
+    import os
+    import subprocess
+    import sys
+
+    # Run in a fresh interpreter: the test session has imported everything
+    code = (
+        "import sys, main; "
+        "print(sorted(m for m in ('passlib', 'prometheus_client') if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        env=dict(os.environ, METRICS_ENABLED="false"), cwd=Path(__file__).resolve().parents[1],
+    ).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,215 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from uuid import uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.core import notifications
+from app.api.questions import STREAM_START
+from app.core.config import settings
+from app.core.notifications import broadcaster, notify_new_questions_async, notify_statement
+from app.core.pagination import decode_cursor, encode_cursor
+from app.main import app
+from app.models.question import Question as QuestionModel
+from tests.conftest import TestingAsyncSessionLocal, auth_headers, create_question
+
+def parse_events(text: str) -> List[Dict[str, str]]:
+    """SSE messages as dicts of their fields; comments are skipped."""
+    events = []
+    for block in text.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            if line and not line.startswith(":"):
+                name, _, value = line.partition(": ")
+                fields[name] = value
+        if fields:
+            events.append(fields)
+    return events
+
+class EventStream:
+    """
+    /api/questions/stream driven over raw ASGI, so events can be read as
+    they're sent (TestClient waits for the whole body).
+    """
+
+    def __init__(self, headers: Dict[str, str]) -> None:
+        self.headers = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+        self.buffer = ""
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.status: Optional[int] = None
+        self.requested = False
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            await self.chunks.put(message.get("body", b"").decode())
+
+    async def __aenter__(self) -> "EventStream":
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": "/api/questions/stream",
+            "raw_path": b"/api/questions/stream", "query_string": b"", "root_path": "",
+            "headers": self.headers, "client": ("testclient", 50000), "server": ("testserver", 80),
+        }
+        self.task = asyncio.create_task(app(scope, self.receive, self.send))
+        return self
+
+    async def next_event(self, timeout: float = 5) -> Dict[str, str]:
+        """The next message, skipping comments."""
+        while True:
+            while "\n\n" not in self.buffer:
+                self.buffer += await asyncio.wait_for(self.chunks.get(), timeout)
+            block, self.buffer = self.buffer.split("\n\n", 1)
+            events = parse_events(block)
+            if events:
+                return events[0]
+
+    async def __aexit__(self, *exc) -> None:
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+def test_stream_pushes_questions_as_they_commit(
+    client: TestClient, test_user: dict, test_user2: dict, test_superuser: dict
+):
+    async def scenario():
+        async with EventStream(auth_headers(test_user2)) as stream:
+            assert await stream.next_event() == {"retry": "5000"}
+            # Subscribed by the time the starting position is sent
+            assert "id" in await stream.next_event()
+            for recipient in (test_superuser, test_user2):
+                response = await asyncio.to_thread(
+                    client.post,
+                    f"/api/questions/user-question/{recipient['id']}",
+                    headers=auth_headers(test_user),
+                    json={"text": f"Hello {recipient['full_name']}?"},
+                )
+                assert response.status_code == 200
+            event = await stream.next_event()
+            assert stream.status == 200
+        return event, response.json()
+
+    event, created = asyncio.run(scenario())
+    assert event["event"] == "question"
+    question = json.loads(event["data"])
+    assert question["id"] == created["id"]
+    assert question["text"] == f"Hello {test_user2['full_name']}?"
+    assert question["author"]["email"] == test_user["email"]
+    assert decode_cursor(event["id"]).id == created["id"]
+    assert broadcaster.subscriber_count() == 0
+
+def test_stream_replays_from_last_event_id(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict, monkeypatch
+):
+    monkeypatch.setattr(settings, "STREAM_MAX_SECONDS", 0.1)
+    base = datetime(2025, 1, 1)
+    ids = [
+        create_question(db, author=test_user, recipient=test_user2, text=f"Q{i}",
+                        created_at=base + timedelta(minutes=i))
+        for i in range(3)
+    ]
+    response = client.get(
+        "/api/questions/stream",
+        headers={**auth_headers(test_user2), "Last-Event-ID": encode_cursor(base, ids[0])},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert "content-encoding" not in response.headers
+    events = [e for e in parse_events(response.text) if e.get("event") == "question"]
+    assert [json.loads(e["data"])["id"] for e in events] == ids[1:]
+
+def test_new_stream_starts_after_the_latest_question(
+    client: TestClient, db: Session, test_user: dict, test_user2: dict, monkeypatch
+):
+    monkeypatch.setattr(settings, "STREAM_MAX_SECONDS", 0.1)
+    headers = auth_headers(test_user2)
+    response = client.get("/api/questions/stream", headers=headers)
+    start = parse_events(response.text)[1]["id"]
+    assert decode_cursor(start).created_at == datetime(1970, 1, 1)
+
+    created_at = datetime(2025, 1, 1)
+    question_id = create_question(
+        db, author=test_user, recipient=test_user2, text="Old news", created_at=created_at
+    )
+    response = client.get("/api/questions/stream", headers=headers)
+    assert parse_events(response.text) == [
+        {"retry": "5000"}, {"id": encode_cursor(created_at, question_id)}
+    ]
+    # A reconnect from the empty start replays it
+    response = client.get("/api/questions/stream", headers={**headers, "Last-Event-ID": start})
+    assert parse_events(response.text)[-1]["event"] == "question"
+
+def test_unusable_last_event_id_starts_afresh(
+    client: TestClient, test_user: dict, monkeypatch
+):
+    monkeypatch.setattr(settings, "STREAM_MAX_SECONDS", 0.1)
+    for last_event_id in ("nope", encode_cursor(datetime(2025, 1, 1), "abc")):
+        response = client.get(
+            "/api/questions/stream",
+            headers={**auth_headers(test_user), "Last-Event-ID": last_event_id},
+        )
+        assert response.status_code == 200
+        assert parse_events(response.text)[1]["id"] == encode_cursor(*STREAM_START)
+
+def test_stream_takes_the_token_as_a_query_parameter(
+    client: TestClient, test_user: dict, monkeypatch
+):
+    monkeypatch.setattr(settings, "STREAM_MAX_SECONDS", 0.1)
+    assert client.get("/api/questions/stream").status_code == 401
+    token = auth_headers(test_user)["Authorization"].split()[1]
+    response = client.get("/api/questions/stream", params={"access_token": token})
+    assert response.status_code == 200
+
+def test_rolled_back_question_notifies_no_one(db: Session, test_user: dict, test_user2: dict):
+    async def send(session, text: str) -> str:
+        question = QuestionModel(
+            id=uuid4(), text=text, author_id=test_user2["id"], recipient_id=test_user["id"],
+            is_daily_question=False, created_at=datetime.utcnow()
+        )
+        session.add(question)
+        await notify_new_questions_async(session, [(question.recipient_id, question.id)])
+        return str(question.id)
+
+    async def scenario():
+        with broadcaster.subscribe(test_user["id"]) as subscription:
+            async with TestingAsyncSessionLocal() as session:
+                await send(session, "Rolled back?")
+                await session.rollback()
+                assert await subscription.next(timeout=0.05) == []
+                committed = await send(session, "Committed?")
+                await session.commit()
+                return committed, await subscription.next(timeout=1)
+
+    committed, notified = asyncio.run(scenario())
+    assert notified == [committed]
+
+def test_slow_subscription_is_closed(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_MAX_PENDING", 2)
+
+    async def scenario():
+        with broadcaster.subscribe("u1") as subscription:
+            broadcaster.dispatch("u1", ["q1", "q2"])
+            broadcaster.dispatch("u1", ["q3"])
+            return await subscription.next(timeout=1)
+
+    assert asyncio.run(scenario()) is None
+
+def test_postgres_notifications_are_one_statement():
+    payloads = notifications._payloads(
+        [("r1", f"q{i}") for i in range(250)] + [("r2", "q0")]
+    )
+    assert [p.count(",") + 1 for p in payloads] == [100, 100, 50, 1]
+    assert payloads[-1] == "r2:q0"
+    sql = str(notify_statement(payloads).compile(dialect=postgresql.dialect()))
+    assert "pg_notify" in sql and "unnest" in sql
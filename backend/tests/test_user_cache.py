@@ -0,0 +1,54 @@
+import time
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.cache import TTLCache, user_cache
+from app.core.security import create_access_token
+
+def test_ttl_cache_lru_and_expiry():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    # "b" is now least recently used and is evicted
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+def test_cached_user_lookup(db: Session, test_user: dict):
+    user = crud.user.get_by_email_cached(db, email=test_user["email"])
+    assert user_cache.stats()["misses"] >= 1
+    hits = user_cache.stats()["hits"]
+
+    cached = crud.user.get_by_email_cached(db, email=test_user["email"])
+    assert user_cache.stats()["hits"] == hits + 1
+    assert cached.id == user.id
+    assert cached in db
+
+def test_update_invalidates_cached_user(db: Session, test_user: dict):
+    user = crud.user.get_by_email_cached(db, email=test_user["email"])
+    crud.user.update(db, db_obj=user, obj_in={"full_name": "Renamed", "is_active": False})
+    assert user_cache.get(test_user["email"]) is None
+
+    user = crud.user.get_by_email_cached(db, email=test_user["email"])
+    assert user.full_name == "Renamed"
+    assert user.is_active is False
+
+def test_current_user_served_from_cache(client: TestClient, test_user: dict):
+    headers = {"Authorization": f"Bearer {create_access_token(test_user['email'])}"}
+    response = client.get("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    hits = user_cache.stats()["hits"]
+
+    response = client.get("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == test_user["email"]
+    assert user_cache.stats()["hits"] == hits + 1
@@ -0,0 +1,41 @@
+from uuid import UUID, uuid4
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.db.types import GUID
+from app.models.answer import Answer as AnswerModel
+from app.models.question import Question as QuestionModel
+from app.models.user import User as UserModel
+from tests.conftest import auth_headers, create_question
+
+def test_guid_is_native_on_postgres_and_text_elsewhere():
+    assert isinstance(GUID().dialect_impl(postgresql.dialect()).impl, postgresql.UUID)
+    assert GUID().dialect_impl(sqlite.dialect()).impl.length == 36
+
+def test_guid_binds_strings_and_loads_uuids(db: Session, test_user: dict, test_user2: dict):
+    question_id = create_question(db, author=test_user2, recipient=test_user, text="Pets?")
+    # A plain string works as a bind value, and comes back as a UUID
+    question = db.query(QuestionModel).filter(QuestionModel.id == question_id).one()
+    assert question.id == UUID(question_id)
+    assert isinstance(question.author_id, UUID)
+
+    user = db.get(UserModel, UUID(test_user["id"]))
+    assert user.email == test_user["email"]
+
+def test_new_rows_get_uuid_keys(db: Session, test_user: dict, test_user2: dict):
+    question_id = create_question(db, author=test_user2, recipient=test_user, text="Pets?")
+    answer = AnswerModel(question_id=question_id, user_id=test_user["id"], text="A cat")
+    db.add(answer)
+    db.commit()
+    assert isinstance(answer.id, UUID)
+
+def test_malformed_ids_are_rejected_before_the_database(client: TestClient, test_user: dict):
+    headers = auth_headers(test_user)
+    response = client.put("/api/answers/not-a-uuid", headers=headers, json={"text": "x"})
+    assert response.status_code == 422
+    response = client.post(
+        "/api/questions/daily/not-a-uuid/answer", headers=headers, json={"text": "x"}
+    )
+    assert response.status_code == 422
+    response = client.put(f"/api/answers/{uuid4()}", headers=headers, json={"text": "x"})
+    assert response.status_code == 404